@@ -5,6 +5,7 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import json
 import os
 import matplotlib.pyplot as plt
@@ -14,7 +15,11 @@ import matplotlib.pyplot as plt
 # -----------------------------
 from modules.rainfall import rainfall_manual
 from modules.scs_cn import runoff_hyetograph, runoff_volume_m3
-from modules.hydrograph import scs_unit_hydrograph, runoff_hydrograph
+from modules.hydrograph import (
+    scs_unit_hydrograph,
+    runoff_hydrograph,
+    runoff_hydrograph_array
+)
 from modules.pond_routing import level_pool_routing
 from modules.tc_calc import tc_kirpich
 from modules.sewer_design import (
@@ -33,6 +38,18 @@ from data import (
     load_project
 )
 
+# -----------------------------
+# IMPORT JOB MANAGER
+# -----------------------------
+from jobs import JobManager, RUNNING, PENDING, CANCELLED, FAILED
+
+# -----------------------------
+# IMPORT INSTRUMENTASI
+# -----------------------------
+from modules import instrumentation
+from modules.instrumentation import timed
+from modules.precision import set_precision
+
 # =========================================================
 # KONFIGURASI APP
 # =========================================================
@@ -58,10 +75,45 @@ menu = st.sidebar.selectbox(
         "Kolam Retensi",
         "Time of Concentration",
         "Storm Sewer Design",
+        "Job Background",
         "Save / Open Project"
     ]
 )
 
+# =========================================================
+# SIDEBAR – INSTRUMENTASI (aktif sebelum engine dipanggil)
+# =========================================================
+# Profile per sesi: saklar & statistik tidak tercampur dengan sesi lain
+# atau thread job background
+if "profile" not in st.session_state:
+    st.session_state["profile"] = instrumentation.Profile()
+instrumentation.activate(st.session_state["profile"])
+
+st.sidebar.divider()
+profiling = st.sidebar.checkbox(
+    "⏱️ Instrumentasi",
+    value=instrumentation.is_enabled()
+)
+profiling_memory = profiling and st.sidebar.checkbox(
+    "Catat memori",
+    False,
+    help="Peak memori tidak akurat bila job background / sesi lain "
+         "sedang berjalan (tracemalloc global per proses)"
+)
+
+if profiling:
+    instrumentation.enable(memory=profiling_memory)
+else:
+    instrumentation.disable()
+
+# presisi hanya untuk thread sesi ini; job background menyimpan
+# presisi saat submit
+set_precision(st.sidebar.selectbox(
+    "Presisi numerik",
+    ["float64", "float32"],
+    help="float32 menghemat memori untuk simulasi panjang"
+))
+
 # =========================================================
 # HELPER – LOAD RAINFALL
 # =========================================================
@@ -89,6 +141,72 @@ def get_rainfall_df():
         return df, dt
 
 
+# =========================================================
+# HELPER – STAGE JOB HIDROGRAF
+# =========================================================
+JOB_CHUNK_STEPS = 5000
+
+
+def hydrograph_job_stages(CN, tc, dt, area):
+    def stage_runoff(df, ctx):
+        df, _ = runoff_hyetograph(df.copy(), CN)
+        return df
+
+    def stage_uh(df, ctx):
+        return df, scs_unit_hydrograph(tc, dt, area)
+
+    def stage_convolution(value, ctx):
+        # konvolusi per chunk limpasan: progress, pembatalan
+        # & checkpoint di tengah stage. Debit q[:e] sudah final setelah
+        # chunk [s, e) sehingga di-append ke disk; checkpoint hanya
+        # menyimpan ekor (len(uh) - 1) yang masih menerima kontribusi.
+        df, uh = value
+        runoff = df["runoff_mm"].values
+        uh_q = uh["uh_cms_per_mm"].values
+        n = len(runoff)
+
+        if ctx.partial is not None:
+            done, tail = ctx.partial
+        else:
+            done, tail = 0, np.zeros(len(uh_q) - 1)
+
+        for s in range(done, n, JOB_CHUNK_STEPS):
+            e = min(s + JOB_CHUNK_STEPS, n)
+            seg = runoff_hydrograph_array(runoff[s:e], uh_q)
+            seg[:len(tail)] += tail
+
+            ctx.append(seg[:e - s])
+            tail = seg[e - s:]
+            ctx.checkpoint((e, tail))
+            ctx.report(e / n, f"{e}/{n} step")
+
+        q = np.concatenate([ctx.appended(), tail])
+        return pd.DataFrame({
+            "time_min": np.arange(len(q)) * dt,
+            "debit_cms": q
+        })
+
+    return [
+        ("Runoff SCS-CN", stage_runoff),
+        ("Unit Hydrograph", stage_uh),
+        ("Konvolusi", stage_convolution)
+    ]
+
+
+# =========================================================
+# JOB MANAGER (bertahan antar rerun Streamlit)
+# =========================================================
+@st.cache_resource
+def get_job_manager():
+    return JobManager(
+        max_workers=2,
+        pipelines={"hydrograph": hydrograph_job_stages}
+    )
+
+
+job_manager = get_job_manager()
+
+
 # =========================================================
 # 1. INPUT RAINFALL
 # =========================================================
@@ -98,11 +216,12 @@ if menu == "Input Rainfall":
     df, _ = get_rainfall_df()
     st.dataframe(df)
 
-    fig, ax = plt.subplots()
-    ax.bar(df["time_min"], df["rainfall_mm"])
-    ax.set_xlabel("Waktu (menit)")
-    ax.set_ylabel("Hujan (mm)")
-    st.pyplot(fig)
+    with timed("app.plot_rainfall"):
+        fig, ax = plt.subplots()
+        ax.bar(df["time_min"], df["rainfall_mm"])
+        ax.set_xlabel("Waktu (menit)")
+        ax.set_ylabel("Hujan (mm)")
+        st.pyplot(fig)
 
     if st.button("💾 Simpan ke rainfall.xlsx"):
         save_rainfall_excel(df)
@@ -137,16 +256,29 @@ elif menu == "Hidrograf":
     tc = st.number_input("Time of Concentration (menit)", 5.0, 300.0, 45.0)
 
     df, dt = get_rainfall_df()
+
+    if st.checkbox("Jalankan sebagai job background"):
+        if st.button("▶️ Submit Job"):
+            job = job_manager.submit(
+                f"Hidrograf CN={CN}, Tc={tc}",
+                initial=df,
+                pipeline="hydrograph",
+                params={"CN": CN, "tc": tc, "dt": float(dt), "area": area}
+            )
+            st.success(f"Job {job.job_id} dikirim, pantau di menu Job Background")
+        st.stop()
+
     df, _ = runoff_hyetograph(df, CN)
 
     uh = scs_unit_hydrograph(tc, dt, area)
     hydro = runoff_hydrograph(df, uh)
 
-    fig, ax = plt.subplots()
-    ax.plot(hydro["time_min"], hydro["debit_cms"])
-    ax.set_xlabel("Waktu (menit)")
-    ax.set_ylabel("Debit (m³/det)")
-    st.pyplot(fig)
+    with timed("app.plot_hydrograph"):
+        fig, ax = plt.subplots()
+        ax.plot(hydro["time_min"], hydro["debit_cms"])
+        ax.set_xlabel("Waktu (menit)")
+        ax.set_ylabel("Debit (m³/det)")
+        st.pyplot(fig)
 
     st.dataframe(hydro)
 
@@ -219,7 +351,50 @@ elif menu == "Storm Sewer Design":
         st.json(pipe)
 
 # =========================================================
-# 7. SAVE / OPEN PROJECT
+# 7. JOB BACKGROUND
+# =========================================================
+elif menu == "Job Background":
+    st.header("⚙️ Job Background")
+
+    if st.button("🔄 Refresh"):
+        st.rerun()
+
+    job_list = job_manager.jobs()
+    if not job_list:
+        st.info("Belum ada job")
+
+    for job in job_list:
+        with st.expander(f"{job.name} [{job.job_id}] – {job.status}"):
+            st.progress(job.progress)
+
+            for i, name in enumerate(job.stage_names):
+                st.caption(
+                    f"{i + 1}. {name}: {job.stage_progress[i] * 100:.0f}% "
+                    f"{job.stage_message[i]}"
+                )
+
+            if job.error:
+                st.error(job.error)
+
+            col1, col2, col3 = st.columns(3)
+            if job.status in (RUNNING, PENDING):
+                if col1.button("⏹️ Batalkan", key=f"cancel_{job.job_id}"):
+                    job_manager.cancel(job.job_id)
+                    st.rerun()
+            if job.status in (CANCELLED, FAILED) and job.resumable:
+                if col2.button("⏯️ Resume", key=f"resume_{job.job_id}"):
+                    job_manager.resume(job.job_id)
+                    st.rerun()
+            if not job_manager.is_active(job.job_id):
+                if col3.button("🗑️ Hapus", key=f"remove_{job.job_id}"):
+                    job_manager.remove(job.job_id)
+                    st.rerun()
+
+            if job.result is not None:
+                st.dataframe(job.result)
+
+# =========================================================
+# 8. SAVE / OPEN PROJECT
 # =========================================================
 elif menu == "Save / Open Project":
     st.header("💾 Save / Open Project")
@@ -235,3 +410,38 @@ elif menu == "Save / Open Project":
     if st.button("📂 Open Project"):
         project = load_project()
         st.json(project)
+
+# =========================================================
+# SIDEBAR – PANEL INSTRUMENTASI
+# =========================================================
+if profiling:
+    with st.sidebar.expander("📊 Statistik Hot-Path", expanded=True):
+        rows = instrumentation.stats()
+        if rows:
+            st.dataframe(pd.DataFrame(rows)[[
+                "name",
+                "calls",
+                "total_time_s",
+                "self_time_s",
+                "mean_time_s",
+                "max_elements_in",
+                "memory_delta_bytes"
+            ]])
+        else:
+            st.caption("Belum ada panggilan tercatat")
+
+        st.download_button(
+            "⬇️ Ekspor JSON",
+            instrumentation.export_json(),
+            file_name="profile.json",
+            mime="application/json"
+        )
+        st.download_button(
+            "⬇️ Ekspor Flame Graph (collapsed)",
+            instrumentation.export_collapsed(),
+            file_name="profile.folded",
+            mime="text/plain"
+        )
+        if st.button("🧹 Reset Statistik"):
+            instrumentation.reset()
+            st.rerun()
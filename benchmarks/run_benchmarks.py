@@ -0,0 +1,343 @@
+# benchmarks/run_benchmarks.py
+"""
+Benchmark seluruh engine pada beberapa skala (10 – 10^7).
+
+Contoh (dijalankan dari root repo):
+
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --max-size 100000 --only runoff_hydrograph
+    python -m benchmarks.run_benchmarks --output benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --compare benchmarks/baseline.json
+
+Hasil ditulis sebagai JSON (waktu & memori puncak per engine per ukuran),
+sehingga bisa dibandingkan dengan baseline sebelumnya untuk mendeteksi
+regresi.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import data
+from modules.hydrograph import (
+    scs_unit_hydrograph,
+    runoff_hydrograph,
+    santa_barbara_routing
+)
+from modules.pond_routing import level_pool_routing
+from modules.channel_routing import muskingum_coefficients, route_reaches
+from modules.scs_cn import runoff_hyetograph
+from modules.sewer_design import estimate_pipe_diameter
+from modules.watershed import Watershed
+
+from benchmarks.generators import (
+    synthetic_rainfall,
+    synthetic_runoff,
+    synthetic_catchments,
+    synthetic_pond,
+    synthetic_inflow,
+    synthetic_design_flows
+)
+
+SIZES = [10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+DT_MIN = 10
+UH_LENGTH = 100
+
+
+# --------------------------------------------------
+# Definisi kasus benchmark
+# --------------------------------------------------
+# setup(n) -> fungsi tanpa argumen yang menjalankan engine satu kali.
+# Data disiapkan di luar pengukuran; input yang dimutasi engine
+# disalin di dalam fungsi agar setiap ulangan identik.
+
+def _case_scs_unit_hydrograph(n):
+    # panjang UH ≈ n ordinat: tb = 2.67 * 0.6 * tc
+    tc = n * DT_MIN / (2.67 * 0.6)
+    return lambda: scs_unit_hydrograph(tc, DT_MIN, 100.0)
+
+
+def _case_runoff_hydrograph(n):
+    runoff = synthetic_runoff(n, DT_MIN)
+    tc = UH_LENGTH * DT_MIN / (2.67 * 0.6)
+    uh = scs_unit_hydrograph(tc, DT_MIN, 100.0)
+    return lambda: runoff_hydrograph(runoff, uh)
+
+
+def _case_santa_barbara_routing(n):
+    runoff = synthetic_runoff(n, DT_MIN)
+    return lambda: santa_barbara_routing(runoff.copy(), 45.0)
+
+
+def _case_level_pool_routing(n):
+    inflow = synthetic_inflow(n, DT_MIN)
+    stage_storage, stage_discharge = synthetic_pond()
+    return lambda: level_pool_routing(
+        inflow, stage_storage, stage_discharge, DT_MIN
+    )
+
+
+def _case_muskingum_route_reaches(n):
+    # 10 ruas x n langkah
+    inflow = np.stack([
+        synthetic_inflow(n, DT_MIN, seed=i)["inflow_cms"].values
+        for i in range(10)
+    ])
+    C0, C1, C2 = muskingum_coefficients(np.linspace(0.5, 3, 10), 0.2, DT_MIN)
+    return lambda: route_reaches(inflow, C0, C1, C2)
+
+
+def _case_runoff_hyetograph(n):
+    rainfall = synthetic_rainfall(n, DT_MIN)
+    return lambda: runoff_hyetograph(rainfall.copy(), 75)
+
+
+def _case_horton_infiltration(n):
+    rainfall = synthetic_rainfall(n, DT_MIN)
+    ws = Watershed(**synthetic_catchments(1).iloc[0].drop("curve_number"))
+    return lambda: ws.horton_infiltration(75.0, 10.0, 4.0, rainfall.copy())
+
+
+def _case_estimate_pipe_diameter(n):
+    flows = synthetic_design_flows(n)
+
+    def run():
+        for Q in flows:
+            try:
+                estimate_pipe_diameter(Q, 0.005, 0.013)
+            except ValueError:
+                pass
+    return run
+
+
+def _case_excel_roundtrip(n):
+    rainfall = synthetic_rainfall(n, DT_MIN)
+
+    def run():
+        data.save_rainfall_excel(rainfall, "bench_rainfall.xlsx")
+        data.load_rainfall_excel("bench_rainfall.xlsx")
+    return run
+
+
+def _case_json_roundtrip(n):
+    rainfall = synthetic_rainfall(n, DT_MIN)
+    project = {
+        "keterangan": "benchmark",
+        "rainfall_mm": rainfall["rainfall_mm"].tolist()
+    }
+
+    def run():
+        data.save_project(project, "bench_project.json")
+        data.load_project("bench_project.json")
+    return run
+
+
+# nama -> (setup, ukuran maksimum default)
+# Batas default menjaga engine berbasis loop Python / Excel
+# (batas 1.048.576 baris) tetap selesai dalam waktu wajar;
+# gunakan --full untuk mengabaikannya.
+CASES = {
+    "scs_unit_hydrograph": (_case_scs_unit_hydrograph, 1_000_000),
+    "runoff_hydrograph": (_case_runoff_hydrograph, 10_000_000),
+    "santa_barbara_routing": (_case_santa_barbara_routing, 100_000),
+    "level_pool_routing": (_case_level_pool_routing, 1_000_000),
+    "muskingum_route_reaches": (_case_muskingum_route_reaches, 1_000_000),
+    "runoff_hyetograph": (_case_runoff_hyetograph, 10_000_000),
+    "horton_infiltration": (_case_horton_infiltration, 10_000_000),
+    "estimate_pipe_diameter": (_case_estimate_pipe_diameter, 100_000),
+    "excel_roundtrip": (_case_excel_roundtrip, 100_000),
+    "json_roundtrip": (_case_json_roundtrip, 1_000_000),
+}
+
+
+# --------------------------------------------------
+# Pengukuran
+# --------------------------------------------------
+def measure(func, repeat: int = 3, min_time: float = 0.2):
+    """
+    Waktu terbaik (detik) dari beberapa ulangan + memori puncak (byte).
+
+    Engine cepat diulang sampai total waktu >= min_time agar hasil
+    stabil; memori puncak diukur terpisah dengan tracemalloc karena
+    tracing memperlambat eksekusi.
+    """
+    times = []
+    total = 0.0
+    while len(times) < repeat or (total < min_time and len(times) < 1000):
+        t0 = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - t0
+        times.append(elapsed)
+        total += elapsed
+        # engine lambat: cukup satu kali ulang
+        if elapsed > 5 * min_time:
+            break
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "time_s": min(times),
+        "mean_time_s": sum(times) / len(times),
+        "repeats": len(times),
+        "peak_memory_bytes": peak
+    }
+
+
+def run_benchmarks(
+    sizes=SIZES,
+    only=None,
+    max_size=None,
+    full=False,
+    repeat=3,
+    verbose=True
+):
+    """
+    Jalankan seluruh kasus benchmark
+
+    Output:
+    dict siap ditulis sebagai JSON
+    """
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = data.DATA_DIR
+        data.DATA_DIR = tmp
+        try:
+            for name, (setup, case_max) in CASES.items():
+                if only and name not in only:
+                    continue
+
+                limit = None if full else case_max
+                if max_size is not None:
+                    limit = max_size if limit is None else min(limit, max_size)
+
+                for n in sizes:
+                    if limit is not None and n > limit:
+                        continue
+
+                    func = setup(n)
+                    row = {"engine": name, "size": n, **measure(func, repeat)}
+                    results.append(row)
+
+                    if verbose:
+                        print(
+                            f"{name:<24} n={n:>10,}  "
+                            f"{row['time_s'] * 1000:>12.3f} ms  "
+                            f"{row['peak_memory_bytes'] / 1e6:>10.2f} MB",
+                            flush=True
+                        )
+        finally:
+            data.DATA_DIR = data_dir
+
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor()
+        },
+        "results": results
+    }
+
+
+# --------------------------------------------------
+# Perbandingan dengan baseline
+# --------------------------------------------------
+def compare(current: dict, baseline: dict, tolerance: float = 1.25):
+    """
+    Bandingkan hasil dengan baseline.
+
+    Regresi = waktu atau memori puncak > tolerance × baseline.
+
+    Output:
+    list of dict (engine, size, metric, baseline, current, ratio)
+    """
+    base = {
+        (r["engine"], r["size"]): r
+        for r in baseline["results"]
+    }
+
+    regressions = []
+    for row in current["results"]:
+        ref = base.get((row["engine"], row["size"]))
+        if ref is None:
+            continue
+
+        for metric in ("time_s", "peak_memory_bytes"):
+            if ref[metric] <= 0:
+                continue
+            ratio = row[metric] / ref[metric]
+            if ratio > tolerance:
+                regressions.append({
+                    "engine": row["engine"],
+                    "size": row["size"],
+                    "metric": metric,
+                    "baseline": ref[metric],
+                    "current": row[metric],
+                    "ratio": ratio
+                })
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark engine hidrologi")
+    parser.add_argument("--output", default="benchmarks/results.json",
+                        help="file JSON hasil benchmark")
+    parser.add_argument("--compare", default=None,
+                        help="file JSON baseline untuk deteksi regresi")
+    parser.add_argument("--tolerance", type=float, default=1.25,
+                        help="rasio maksimum terhadap baseline")
+    parser.add_argument("--only", nargs="*", choices=sorted(CASES),
+                        help="hanya jalankan engine tertentu")
+    parser.add_argument("--max-size", type=int, default=None,
+                        help="ukuran maksimum yang dijalankan")
+    parser.add_argument("--full", action="store_true",
+                        help="abaikan batas ukuran default per engine")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    result = run_benchmarks(
+        only=args.only,
+        max_size=args.max_size,
+        full=args.full,
+        repeat=args.repeat
+    )
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=4)
+    print(f"Hasil disimpan ke {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        regressions = compare(result, baseline, args.tolerance)
+        for r in regressions:
+            print(
+                f"REGRESI {r['engine']} n={r['size']:,} {r['metric']}: "
+                f"{r['baseline']:.4g} → {r['current']:.4g} "
+                f"(x{r['ratio']:.2f})"
+            )
+        if regressions:
+            return 1
+        print("Tidak ada regresi")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,32 +3,49 @@ import pandas as pd
 import json
 import os
 
+from modules.instrumentation import instrument
+from modules.gauge_ingest import load_gauge_directory
+
 DATA_DIR = "data"
 
 
 # -------------------------------
 # RAINFALL
 # -------------------------------
+@instrument
 def load_rainfall_excel(filename="rainfall.xlsx"):
     path = os.path.join(DATA_DIR, filename)
     df = pd.read_excel(path)
     return df
 
 
+@instrument
 def save_rainfall_excel(df, filename="rainfall.xlsx"):
     path = os.path.join(DATA_DIR, filename)
     df.to_excel(path, index=False)
 
 
+@instrument
+def load_gauge_network(dirname="gauges", dt_min=None, **kwargs):
+    """
+    Baca seluruh file gauge di data/<dirname> (paralel)
+    ke satu GaugeStore (waktu × gauge)
+    """
+    path = os.path.join(DATA_DIR, dirname)
+    return load_gauge_directory(path, dt_min=dt_min, **kwargs)
+
+
 # -------------------------------
 # PROJECT SAVE / OPEN
 # -------------------------------
+@instrument
 def save_project(data: dict, filename="project.json"):
     path = os.path.join(DATA_DIR, filename)
     with open(path, "w") as f:
         json.dump(data, f, indent=4)
 
 
+@instrument
 def load_project(filename="project.json"):
     path = os.path.join(DATA_DIR, filename)
     with open(path) as f:
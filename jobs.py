@@ -0,0 +1,493 @@
+# jobs.py
+import json
+import os
+import pickle
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from modules.precision import get_precision, precision
+
+DATA_DIR = "data"
+JOBS_DIR = os.path.join(DATA_DIR, "jobs")
+
+# jarak minimum antar checkpoint ke disk (detik)
+CHECKPOINT_INTERVAL_S = 5.0
+
+# status job
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class JobCancelled(Exception):
+    """
+    Dilempar di dalam stage ketika job dibatalkan
+    """
+
+
+# -------------------------------
+# KONTEKS STAGE
+# -------------------------------
+class JobContext:
+    """
+    Objek yang diterima setiap fungsi stage.
+
+    - report(fraction, message) : lapor progress stage (0 – 1)
+    - check()                   : lempar JobCancelled bila job dibatalkan
+    - checkpoint(obj)           : simpan state parsial stage; ke disk
+                                  paling sering tiap CHECKPOINT_INTERVAL_S
+    - append(array)             : tambahkan hasil final ke file parsial
+                                  append-only (float64)
+    - appended()                : seluruh data append yang tercatat
+                                  di checkpoint terakhir
+    - partial                   : state parsial terakhir (untuk resume)
+
+    Data append dan state checkpoint selalu konsisten: saat resume,
+    file append dipotong ke panjang yang tercatat di checkpoint.
+    """
+
+    def __init__(self, job, stage_index: int):
+        self._job = job
+        self._stage_index = stage_index
+        self.partial, self._n_appended = job._load_partial(stage_index)
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    def report(self, fraction: float, message: str = ""):
+        self._job._set_stage_progress(self._stage_index, fraction, message)
+        self.check()
+
+    def check(self):
+        if self._job._cancel_event.is_set():
+            raise JobCancelled(self._job.job_id)
+
+    def checkpoint(self, obj, force: bool = False):
+        self.partial = obj
+        self._dirty = True
+        now = time.monotonic()
+        if force or now - self._last_save >= self._job.checkpoint_interval_s:
+            self.flush()
+
+    def flush(self):
+        """
+        Tulis checkpoint yang tertunda ke disk
+        """
+        if self._dirty:
+            self._job._save_partial(
+                self._stage_index, self.partial, self._n_appended
+            )
+            self._dirty = False
+            self._last_save = time.monotonic()
+
+    def append(self, array):
+        array = np.ascontiguousarray(array, dtype=np.float64)
+        self._job._append_partial(self._stage_index, array)
+        self._n_appended += len(array)
+
+    def appended(self):
+        return self._job._read_appended(self._stage_index, self._n_appended)
+
+
+# -------------------------------
+# JOB
+# -------------------------------
+class Job:
+    """
+    Pipeline engine yang dijalankan bertahap (stage demi stage).
+
+    stages   : list of (nama, fungsi)
+        fungsi(hasil_stage_sebelumnya, ctx) -> hasil stage
+    pipeline : nama pipeline terdaftar di JobManager (opsional);
+               bersama params dipakai untuk menyusun ulang stage
+               saat job dimuat dari disk
+    dtype    : presisi numerik seluruh stage (default: presisi thread
+               pengirim saat submit), tidak ikut berubah bila presisi
+               app diganti selama job berjalan
+    """
+
+    def __init__(
+        self,
+        name: str,
+        stages: list,
+        initial=None,
+        job_id=None,
+        pipeline: str = None,
+        params: dict = None,
+        dtype=None
+    ):
+        self.job_id = job_id or uuid.uuid4().hex[:8]
+        self.name = name
+        self.stages = list(stages)
+        self.initial = initial
+        self.pipeline = pipeline
+        self.params = params or {}
+        self.dtype = str(dtype or get_precision())
+
+        self.status = PENDING
+        self.error = None
+        self.result = None
+        self.created = time.time()
+        self.stage_progress = [0.0] * len(self.stages)
+        self.stage_message = [""] * len(self.stages)
+        self.completed_stages = 0
+
+        self.checkpoint_interval_s = CHECKPOINT_INTERVAL_S
+
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------
+    @property
+    def directory(self):
+        return os.path.join(JOBS_DIR, self.job_id)
+
+    @property
+    def progress(self):
+        """
+        Progress total (0 – 1), rata-rata seluruh stage
+        """
+        if not self.stages:
+            return 1.0
+        return sum(self.stage_progress) / len(self.stages)
+
+    @property
+    def stage_names(self):
+        return [name for name, _ in self.stages]
+
+    @property
+    def resumable(self):
+        """
+        False untuk job hasil muat ulang yang pipeline-nya tidak terdaftar
+        """
+        return all(func is not None for _, func in self.stages)
+
+    def summary(self):
+        return {
+            "job_id": self.job_id,
+            "name": self.name,
+            "status": self.status,
+            "progress": self.progress,
+            "completed_stages": self.completed_stages,
+            "stages": [
+                {
+                    "name": name,
+                    "progress": self.stage_progress[i],
+                    "message": self.stage_message[i]
+                }
+                for i, name in enumerate(self.stage_names)
+            ],
+            "error": self.error
+        }
+
+    # --------------------------------------------------
+    def cancel(self):
+        self._cancel_event.set()
+
+    def run(self):
+        """
+        Jalankan stage yang belum selesai secara berurutan.
+        Hasil tiap stage disimpan ke disk sehingga bisa di-resume.
+
+        Flag batal tidak direset di sini (lihat JobManager._start),
+        agar cancel yang masuk sebelum run dimulai tetap berlaku.
+        """
+        self.status = RUNNING
+        self.error = None
+        self._save_state()
+
+        value = self.initial
+        if self.completed_stages > 0:
+            value = self._load_stage_result(self.completed_stages - 1)
+
+        ctx = None
+        try:
+            with precision(self.dtype):
+                for i in range(self.completed_stages, len(self.stages)):
+                    _, func = self.stages[i]
+                    ctx = JobContext(self, i)
+                    ctx.check()
+
+                    value = func(value, ctx)
+
+                    self._save_stage_result(i, value)
+                    self._set_stage_progress(i, 1.0, "selesai")
+                    self.completed_stages = i + 1
+                    self._save_state()
+
+            self.result = value
+            self.status = DONE
+
+        except JobCancelled:
+            self.status = CANCELLED
+
+        except Exception as exc:
+            self.status = FAILED
+            self.error = f"{type(exc).__name__}: {exc}"
+
+        if ctx is not None and self.status != DONE:
+            ctx.flush()
+        self._save_state()
+        return self.result
+
+    # --------------------------------------------------
+    # Persistensi
+    # --------------------------------------------------
+    def _path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def _set_stage_progress(self, i, fraction, message):
+        with self._lock:
+            self.stage_progress[i] = min(max(float(fraction), 0.0), 1.0)
+            self.stage_message[i] = message
+
+    def _save_state(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            state = self.summary()
+        state.update({
+            "created": self.created,
+            "pipeline": self.pipeline,
+            "params": self.params,
+            "dtype": self.dtype
+        })
+        with open(self._path("state.json"), "w") as f:
+            json.dump(state, f, indent=4)
+
+    def _save_initial(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path("initial.pkl"), "wb") as f:
+            pickle.dump(self.initial, f)
+
+    @classmethod
+    def load(cls, directory: str, pipelines: dict = None):
+        """
+        Muat job dari data/jobs/<id>/. Stage disusun ulang dari pipeline
+        terdaftar; job yang terhenti di tengah jalan (server mati)
+        ditandai CANCELLED sehingga bisa di-resume.
+        """
+        with open(os.path.join(directory, "state.json")) as f:
+            state = json.load(f)
+
+        names = [s["name"] for s in state["stages"]]
+        builder = (pipelines or {}).get(state.get("pipeline"))
+        if builder is not None:
+            stages = builder(**state.get("params", {}))
+        else:
+            stages = [(name, None) for name in names]
+
+        job = cls(
+            state["name"],
+            stages,
+            job_id=state["job_id"],
+            pipeline=state.get("pipeline"),
+            params=state.get("params"),
+            dtype=state.get("dtype")
+        )
+        job.created = state.get("created", os.path.getmtime(directory))
+        job.status = state["status"]
+        job.error = state.get("error")
+        job.completed_stages = state["completed_stages"]
+        for i, s in enumerate(state["stages"][:len(job.stages)]):
+            job.stage_progress[i] = s["progress"]
+            job.stage_message[i] = s["message"]
+
+        initial = job._path("initial.pkl")
+        if os.path.exists(initial):
+            with open(initial, "rb") as f:
+                job.initial = pickle.load(f)
+
+        if job.status in (PENDING, RUNNING):
+            job.status = CANCELLED
+        if job.status == DONE and job.completed_stages > 0:
+            job.result = job._load_stage_result(job.completed_stages - 1)
+        return job
+
+    def _save_stage_result(self, i, value):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(f"stage_{i}.pkl"), "wb") as f:
+            pickle.dump(value, f)
+
+        for suffix in ("partial.pkl", "partial.bin"):
+            partial = self._path(f"stage_{i}.{suffix}")
+            if os.path.exists(partial):
+                os.remove(partial)
+
+    def _load_stage_result(self, i):
+        with open(self._path(f"stage_{i}.pkl"), "rb") as f:
+            return pickle.load(f)
+
+    def _save_partial(self, i, obj, n_appended=0):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(f"stage_{i}.partial.pkl")
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump({"state": obj, "appended": n_appended}, f)
+        os.replace(path + ".tmp", path)
+
+    def _load_partial(self, i):
+        """
+        State parsial & panjang data append; file append dipotong ke
+        panjang yang tercatat (data setelah checkpoint terakhir dibuang)
+        """
+        path = self._path(f"stage_{i}.partial.pkl")
+        state, n_appended = None, 0
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                saved = pickle.load(f)
+            state, n_appended = saved["state"], saved["appended"]
+
+        bin_path = self._path(f"stage_{i}.partial.bin")
+        if os.path.exists(bin_path):
+            with open(bin_path, "r+b") as f:
+                f.truncate(n_appended * 8)
+        return state, n_appended
+
+    def _append_partial(self, i, array):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(f"stage_{i}.partial.bin"), "ab") as f:
+            f.write(array.tobytes())
+
+    def _read_appended(self, i, n):
+        path = self._path(f"stage_{i}.partial.bin")
+        if n == 0 or not os.path.exists(path):
+            return np.zeros(0)
+        return np.fromfile(path, dtype=np.float64, count=n)
+
+
+# -------------------------------
+# JOB MANAGER
+# -------------------------------
+class JobManager:
+    """
+    Menjalankan Job di thread pool terpisah dari thread script Streamlit,
+    sehingga interaksi widget (rerun) tidak menghentikan perhitungan.
+
+    pipelines : dict nama → builder(**params) -> list stage.
+                Job dari pipeline terdaftar dimuat ulang dari data/jobs/
+                saat manager dibuat (mis. setelah server restart).
+    """
+
+    def __init__(self, max_workers: int = 2, pipelines: dict = None):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="hidro-job"
+        )
+        self._jobs = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+        self.pipelines = dict(pipelines or {})
+        self.load()
+
+    # --------------------------------------------------
+    def register_pipeline(self, name: str, builder):
+        self.pipelines[name] = builder
+
+    def load(self):
+        """
+        Muat job yang tersimpan di data/jobs/ (yang belum ada di memori)
+        """
+        if not os.path.isdir(JOBS_DIR):
+            return
+        for job_id in os.listdir(JOBS_DIR):
+            directory = os.path.join(JOBS_DIR, job_id)
+            if job_id in self._jobs or not os.path.exists(
+                os.path.join(directory, "state.json")
+            ):
+                continue
+            try:
+                job = Job.load(directory, self.pipelines)
+            except (OSError, ValueError, KeyError, pickle.PickleError):
+                continue
+            with self._lock:
+                self._jobs[job.job_id] = job
+
+    def submit(
+        self,
+        name: str,
+        stages: list = None,
+        initial=None,
+        pipeline: str = None,
+        params: dict = None
+    ):
+        """
+        Kirim job baru: stage langsung, atau pipeline terdaftar + params
+        (hanya job pipeline yang bisa di-resume setelah restart)
+        """
+        if stages is None:
+            stages = self.pipelines[pipeline](**(params or {}))
+        job = Job(name, stages, initial, pipeline=pipeline, params=params)
+        with self._lock:
+            self._jobs[job.job_id] = job
+        job._save_initial()
+        job._save_state()
+        self._start(job)
+        return job
+
+    def _start(self, job):
+        # reset flag batal sebelum job masuk antrean; cancel() setelah
+        # titik ini tetap terlihat oleh run()
+        job._cancel_event.clear()
+        job.status = PENDING
+        self._futures[job.job_id] = self._executor.submit(job.run)
+
+    def get(self, job_id: str):
+        return self._jobs.get(job_id)
+
+    def jobs(self):
+        with self._lock:
+            return sorted(
+                self._jobs.values(),
+                key=lambda j: j.created,
+                reverse=True
+            )
+
+    def is_active(self, job_id: str):
+        future = self._futures.get(job_id)
+        return future is not None and not future.done()
+
+    # --------------------------------------------------
+    def cancel(self, job_id: str):
+        job = self._jobs[job_id]
+        job.cancel()
+        future = self._futures.get(job_id)
+        # job yang belum sempat berjalan langsung dibatalkan
+        if future is not None and future.cancel():
+            job.status = CANCELLED
+            job._save_state()
+
+    def resume(self, job_id: str):
+        """
+        Lanjutkan job yang dibatalkan / gagal dari stage terakhir
+        yang belum selesai
+        """
+        job = self._jobs[job_id]
+        if self.is_active(job_id):
+            return job
+        if job.status not in (CANCELLED, FAILED):
+            raise ValueError(f"Job {job_id} tidak bisa di-resume ({job.status})")
+        if not job.resumable:
+            raise ValueError(
+                f"Pipeline job {job_id} tidak terdaftar, tidak bisa di-resume"
+            )
+        self._start(job)
+        return job
+
+    def remove(self, job_id: str):
+        if self.is_active(job_id):
+            raise ValueError("Job masih berjalan, batalkan terlebih dahulu")
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            self._futures.pop(job_id, None)
+        if job is not None:
+            shutil.rmtree(job.directory, ignore_errors=True)
+
+    def shutdown(self, wait: bool = False):
+        for job in self._jobs.values():
+            job.cancel()
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,365 @@
+# modules/calibration.py
+"""
+Kalibrasi parameter DAS terhadap hidrograf terukur.
+
+Satu generasi populasi parameter dievaluasi sekaligus sebagai array
+(n_pop, n_t): limpasan (SCS-CN atau Horton), UH SCS per Tc, dan
+konvolusi via FFT. Optimasi global memakai differential evolution,
+dengan evaluasi populasi yang bisa dibagi ke process pool dan
+checkpoint per generasi.
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from modules.hydrograph import scs_unit_hydrograph_batch
+from modules.instrumentation import instrument
+from modules.precision import ACCUMULATOR
+from modules.scs_cn import runoff_total_batch
+from modules.watershed import Watershed
+
+
+# --------------------------------------------------
+# 1. Metrik kecocokan (baris = anggota populasi)
+# --------------------------------------------------
+def nse(sim, obs):
+    """
+    Nash–Sutcliffe Efficiency (1 = sempurna)
+    """
+    sim = np.atleast_2d(sim)
+    obs = np.asarray(obs, dtype=float)
+    num = ((sim - obs) ** 2).sum(axis=-1, dtype=ACCUMULATOR)
+    den = ((obs - obs.mean()) ** 2).sum(dtype=ACCUMULATOR)
+    return 1 - num / den
+
+
+def kge(sim, obs):
+    """
+    Kling–Gupta Efficiency (1 = sempurna)
+    """
+    sim = np.atleast_2d(sim)
+    obs = np.asarray(obs, dtype=float)
+
+    sim_mean = sim.mean(axis=-1)
+    sim_std = sim.std(axis=-1)
+    obs_mean = obs.mean()
+    obs_std = obs.std()
+
+    cov = ((sim - sim_mean[:, None]) * (obs - obs_mean)).mean(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = np.nan_to_num(cov / (sim_std * obs_std))
+
+    alpha = sim_std / obs_std
+    beta = sim_mean / obs_mean
+    return 1 - np.sqrt((r - 1) ** 2 + (alpha - 1) ** 2 + (beta - 1) ** 2)
+
+
+def peak_error(sim, obs):
+    """
+    Galat relatif debit puncak (sim - obs) / obs
+    """
+    sim = np.atleast_2d(sim)
+    obs_peak = np.max(obs)
+    return (sim.max(axis=-1) - obs_peak) / obs_peak
+
+
+METRICS = {
+    "nse": nse,
+    "kge": kge,
+    "peak_error": peak_error,
+}
+
+
+# --------------------------------------------------
+# 2. Problem kalibrasi
+# --------------------------------------------------
+DEFAULT_BOUNDS = {
+    "scs": {
+        "curve_number": (30.0, 98.0),
+        "tc_min": (5.0, 300.0),
+    },
+    "horton": {
+        "f0": (10.0, 250.0),
+        "fc": (0.5, 50.0),
+        "k": (0.5, 20.0),
+        "tc_min": (5.0, 300.0),
+    },
+}
+
+
+class CalibrationProblem:
+    """
+    Data & model untuk kalibrasi satu DAS
+
+    rainfall_mm  : array hujan per step
+    observed_cms : array debit terukur, step sama dengan hujan
+    model        : "scs" (curve_number, tc_min) atau
+                   "horton" (f0, fc, k, tc_min)
+    bounds       : dict nama → (min, max), menimpa DEFAULT_BOUNDS
+    metric       : "nse", "kge" atau "peak_error"
+    """
+
+    def __init__(
+        self,
+        rainfall_mm,
+        observed_cms,
+        dt_min: float,
+        area_ha: float,
+        model: str = "scs",
+        bounds: dict = None,
+        metric: str = "nse",
+        ia_factor: float = 0.2
+    ):
+        if model not in DEFAULT_BOUNDS:
+            raise ValueError("Model harus 'scs' atau 'horton'")
+        if metric not in METRICS:
+            raise ValueError(f"Metrik harus salah satu dari {list(METRICS)}")
+
+        self.rainfall_mm = np.asarray(rainfall_mm, dtype=float)
+        self.observed_cms = np.asarray(observed_cms, dtype=float)
+        self.dt_min = dt_min
+        self.area_ha = area_ha
+        self.model = model
+        self.metric = metric
+        self.ia_factor = ia_factor
+
+        self.bounds = dict(DEFAULT_BOUNDS[model])
+        # Tc minimum agar UH punya ordinat tidak nol (tp >= dt)
+        lo, hi = self.bounds["tc_min"]
+        self.bounds["tc_min"] = (max(lo, dt_min / 0.6), hi)
+        self.bounds.update(bounds or {})
+
+        self.param_names = list(self.bounds)
+        self.lower = np.array([self.bounds[p][0] for p in self.param_names])
+        self.upper = np.array([self.bounds[p][1] for p in self.param_names])
+
+        self._watershed = Watershed(area_ha, 0.0, 0.0)
+
+    # --------------------------------------------------
+    def as_dict(self, population):
+        """
+        Array (n_pop, n_param) → dict nama → array (n_pop,)
+        """
+        population = np.atleast_2d(population)
+        return {
+            name: population[:, i]
+            for i, name in enumerate(self.param_names)
+        }
+
+    def _runoff(self, p):
+        rain = self.rainfall_mm
+        n_pop = len(p["tc_min"])
+
+        if self.model == "scs":
+            # distribusi proporsional hujan, seperti runoff_hyetograph
+            P_total = rain.sum(dtype=ACCUMULATOR)
+            Q_total = runoff_total_batch(
+                P_total, p["curve_number"], self.ia_factor
+            )
+            ratio = rain / P_total if P_total > 0 else np.zeros_like(rain)
+            return Q_total[:, None] * ratio[None, :]
+
+        # Horton: hujan efektif = excess_rain_mm
+        f0 = p["f0"][:, None]
+        fc = np.minimum(p["fc"], p["f0"])[:, None]
+        _, excess = self._watershed.horton_infiltration_array(
+            f0,
+            fc,
+            p["k"][:, None],
+            np.broadcast_to(rain, (n_pop, len(rain))),
+            self.dt_min,
+            time_min=np.arange(len(rain)) * self.dt_min,
+            dtype=np.float64
+        )
+        return excess
+
+    @instrument
+    def simulate(self, population):
+        """
+        Hidrograf seluruh populasi
+
+        Output:
+        array (n_pop, len(observed_cms))
+        """
+        p = self.as_dict(population)
+        runoff = self._runoff(p)
+        uh = scs_unit_hydrograph_batch(
+            p["tc_min"], self.dt_min, self.area_ha, dtype=np.float64
+        )
+
+        # konvolusi batch via FFT
+        n_obs = len(self.observed_cms)
+        n_full = runoff.shape[1] + uh.shape[1] - 1
+        n_fft = 1 << int(np.ceil(np.log2(max(n_full, 1))))
+        q = np.fft.irfft(
+            np.fft.rfft(runoff, n_fft) * np.fft.rfft(uh, n_fft),
+            n_fft
+        )[:, :n_obs]
+
+        if q.shape[1] < n_obs:
+            q = np.pad(q, ((0, 0), (0, n_obs - q.shape[1])))
+        return q
+
+    def score(self, population):
+        """
+        Seluruh metrik untuk populasi
+
+        Output:
+        dict metrik → array (n_pop,)
+        """
+        q = self.simulate(population)
+        return {
+            name: func(q, self.observed_cms)
+            for name, func in METRICS.items()
+        }
+
+    def objective(self, population):
+        """
+        Nilai yang diminimalkan (0 = sempurna)
+        """
+        q = self.simulate(population)
+        value = METRICS[self.metric](q, self.observed_cms)
+        if self.metric == "peak_error":
+            return np.abs(value)
+        return 1 - value
+
+
+def _evaluate_chunk(args):
+    problem, population = args
+    return problem.objective(population)
+
+
+def _evaluate(problem, population, pool, workers):
+    if pool is None:
+        return problem.objective(population)
+
+    chunks = np.array_split(population, workers)
+    parts = pool.map(_evaluate_chunk, [(problem, c) for c in chunks])
+    return np.concatenate(list(parts))
+
+
+# --------------------------------------------------
+# 3. Differential evolution
+# --------------------------------------------------
+def _save_checkpoint(path, generation, population, fitness, rng, history):
+    tmp = path + ".tmp"
+    np.savez(
+        tmp,
+        generation=generation,
+        population=population,
+        fitness=fitness,
+        history=np.array(history),
+        rng_state=json.dumps(rng.bit_generator.state)
+    )
+    os.replace(tmp + ".npz", path)
+
+
+def _load_checkpoint(path, rng):
+    with np.load(path) as z:
+        rng.bit_generator.state = json.loads(str(z["rng_state"]))
+        return (
+            int(z["generation"]),
+            z["population"],
+            z["fitness"],
+            z["history"].tolist()
+        )
+
+
+@instrument
+def differential_evolution(
+    problem: CalibrationProblem,
+    pop_size: int = 40,
+    generations: int = 100,
+    F: float = 0.7,
+    CR: float = 0.9,
+    seed: int = 0,
+    workers: int = 1,
+    checkpoint: str = None,
+    tol: float = 1e-8,
+    callback=None
+):
+    """
+    Differential evolution (DE/rand/1/bin) dengan evaluasi populasi batch
+
+    workers    : > 1 → populasi dibagi ke ProcessPoolExecutor
+    checkpoint : path file .npz; disimpan tiap generasi dan dilanjutkan
+                 otomatis bila file sudah ada
+    callback   : fungsi(generation, best_params, best_value), dipanggil
+                 tiap generasi (mis. ctx.report untuk Job)
+
+    Output:
+    dict best_params, best_value, scores, generations, history
+    """
+    rng = np.random.default_rng(seed)
+    n_param = len(problem.param_names)
+    span = problem.upper - problem.lower
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        if checkpoint and os.path.exists(checkpoint):
+            start, population, fitness, history = _load_checkpoint(
+                checkpoint, rng
+            )
+        else:
+            population = problem.lower + rng.random((pop_size, n_param)) * span
+            fitness = _evaluate(problem, population, pool, workers)
+            history = []
+            start = 0
+
+        pop_size = len(population)
+        idx = np.arange(pop_size)
+
+        for gen in range(start, generations):
+            # mutasi: a + F (b - c), tiga anggota acak berbeda
+            r = np.argsort(rng.random((pop_size, pop_size - 1)), axis=1)[:, :3]
+            others = np.where(r >= idx[:, None], r + 1, r)
+            a, b, c = (population[others[:, i]] for i in range(3))
+            mutant = np.clip(a + F * (b - c), problem.lower, problem.upper)
+
+            # crossover binomial (minimal satu parameter dari mutan)
+            cross = rng.random((pop_size, n_param)) < CR
+            cross[idx, rng.integers(0, n_param, pop_size)] = True
+            trial = np.where(cross, mutant, population)
+
+            trial_fitness = _evaluate(problem, trial, pool, workers)
+
+            better = trial_fitness <= fitness
+            population[better] = trial[better]
+            fitness[better] = trial_fitness[better]
+
+            best = int(np.argmin(fitness))
+            history.append(float(fitness[best]))
+
+            if checkpoint:
+                _save_checkpoint(
+                    checkpoint, gen + 1, population, fitness, rng, history
+                )
+            if callback is not None:
+                callback(
+                    gen + 1,
+                    dict(zip(problem.param_names, population[best])),
+                    float(fitness[best])
+                )
+
+            if np.std(fitness) < tol:
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    best = int(np.argmin(fitness))
+    best_params = population[best]
+    scores = {
+        name: float(value[0])
+        for name, value in problem.score(best_params[None, :]).items()
+    }
+
+    return {
+        "best_params": dict(zip(problem.param_names, best_params.tolist())),
+        "best_value": float(fitness[best]),
+        "scores": scores,
+        "generations": len(history),
+        "history": history
+    }
@@ -0,0 +1,400 @@
+# modules/channel_routing.py
+"""
+Routing saluran / sungai: Muskingum & Muskingum-Cunge.
+
+Semua fungsi bekerja pada array dengan sumbu waktu di akhir:
+
+    inflow.shape = (n_reach, n_t)            satu kejadian per ruas
+    inflow.shape = (n_reach, n_storm, n_t)   banyak kejadian per ruas
+
+Koefisien (C0, C1, C2) dihitung sekali per ruas. Rekursi
+O[t] = C0 I[t] + C1 I[t-1] + C2 O[t-1] dievaluasi per time step,
+tervektorisasi pada sumbu ruas & kejadian, langsung ke buffer output.
+Bila batch sempit (sedikit ruas × kejadian, record panjang), rekursi
+dievaluasi per blok waktu sebagai perkalian matriks Toeplitz agar
+loop Python hanya berjalan n_t / block kali.
+"""
+import numpy as np
+import pandas as pd
+
+from modules.instrumentation import instrument
+from modules.precision import get_dtype
+
+
+# --------------------------------------------------
+# 1. Koefisien Muskingum
+# --------------------------------------------------
+@instrument
+def muskingum_coefficients(
+    K_hr,
+    X,
+    dt_min: float
+):
+    """
+    Koefisien Muskingum per ruas
+
+    K  : konstanta tampungan (jam), skalar / array
+    X  : faktor pembobot (0 – 0.5), skalar / array
+    dt : time step (menit)
+
+    Output:
+    C0, C1, C2 (array, C0 + C1 + C2 = 1)
+    """
+    K = np.atleast_1d(np.asarray(K_hr, dtype=float)) * 60
+    X = np.broadcast_to(np.asarray(X, dtype=float), K.shape)
+
+    if np.any(K <= 0):
+        raise ValueError("K harus > 0")
+    if np.any((X < 0) | (X > 0.5)):
+        raise ValueError("X harus antara 0 – 0.5")
+
+    D = 2 * K * (1 - X) + dt_min
+    C0 = (dt_min - 2 * K * X) / D
+    C1 = (dt_min + 2 * K * X) / D
+    C2 = (2 * K * (1 - X) - dt_min) / D
+
+    return C0, C1, C2
+
+
+# --------------------------------------------------
+# 2. Parameter Muskingum-Cunge
+# --------------------------------------------------
+@instrument
+def muskingum_cunge_parameters(
+    length_m,
+    slope,
+    width_m,
+    n,
+    Q_ref
+):
+    """
+    Parameter Muskingum-Cunge (saluran persegi lebar, Manning)
+    pada debit referensi Q_ref (m3/s)
+
+    c = 5/3 V                     (celerity)
+    K = L / c
+    X = 0.5 * (1 - Q / (B S c L))
+
+    X dibatasi 0 – 0.5; X < 0 berarti ruas perlu dibagi
+    menjadi ruas yang lebih pendek.
+
+    Output:
+    K (jam), X
+    """
+    L = np.asarray(length_m, dtype=float)
+    S = np.asarray(slope, dtype=float)
+    B = np.asarray(width_m, dtype=float)
+    Q = np.asarray(Q_ref, dtype=float)
+
+    if np.any(S <= 0):
+        raise ValueError("Kemiringan harus > 0")
+
+    depth = (Q * n / (B * S ** 0.5)) ** 0.6
+    V = Q / (B * depth)
+    c = 5 / 3 * V
+
+    K_hr = L / c / 3600
+    X = 0.5 * (1 - Q / (B * S * c * L))
+
+    return K_hr, np.clip(X, 0.0, 0.5)
+
+
+@instrument
+def muskingum_cunge_coefficients(
+    length_m,
+    slope,
+    width_m,
+    n,
+    Q_ref,
+    dt_min: float
+):
+    """
+    Koefisien C0, C1, C2 Muskingum-Cunge per ruas
+    """
+    K_hr, X = muskingum_cunge_parameters(length_m, slope, width_m, n, Q_ref)
+    return muskingum_coefficients(K_hr, X, dt_min)
+
+
+# --------------------------------------------------
+# 3. Router (state per ruas, mode streaming)
+# --------------------------------------------------
+class MuskingumRouter:
+    """
+    Routing banyak ruas sekaligus dengan state antar-chunk.
+
+    C0, C1, C2 : array (n_reach,)
+    block      : panjang blok waktu untuk evaluasi matriks Toeplitz
+                 (hanya untuk batch <= BLOCK_MAX_LANES; <= 1 = nonaktif)
+    dtype      : float32 / float64 (default: presisi global)
+
+    Pemakaian streaming:
+
+        router = MuskingumRouter(C0, C1, C2)
+        for chunk in chunks:             # chunk.shape = (n_reach, ..., n_t)
+            out = router.route(chunk)
+    """
+
+    # batas n_reach × n_storm untuk jalur blok Toeplitz; matriks T
+    # berukuran (n_reach, block, block), jadi hanya layak untuk batch sempit
+    BLOCK_MAX_LANES = 32
+
+    def __init__(self, C0, C1, C2, block: int = 64, dtype=None):
+        self.dtype = get_dtype(dtype)
+        self.C0 = np.atleast_1d(np.asarray(C0, dtype=self.dtype))
+        self.C1 = np.atleast_1d(np.asarray(C1, dtype=self.dtype))
+        self.C2 = np.atleast_1d(np.asarray(C2, dtype=self.dtype))
+        self.block = block
+        self._T = None
+        self._P = None
+
+        self.reset()
+
+    @property
+    def n_reach(self):
+        return len(self.C0)
+
+    def reset(self, initial_inflow=None, initial_outflow=None):
+        """
+        Kosongkan state. Tanpa nilai awal, outflow awal = inflow awal.
+
+        Nilai awal boleh skalar, per ruas (n_reach,) atau penuh
+        (n_reach, ...); di-broadcast ke batch saat route.
+        """
+        self._I_prev = initial_inflow
+        self._O_prev = initial_outflow
+
+    def _coef(self, c, ndim):
+        return c.reshape((-1,) + (1,) * (ndim - 1))
+
+    def _state(self, value, shape):
+        # nilai per ruas (n_reach,) → (n_reach, 1, ...) seperti koefisien
+        value = np.asarray(value, dtype=self.dtype)
+        if value.ndim == 1 and len(shape) > 1:
+            value = self._coef(value, len(shape))
+        return np.broadcast_to(value, shape)
+
+    def _toeplitz(self):
+        # T[r, j, i] = C2^(j - i) untuk i <= j, P[r, j] = C2^(j + 1)
+        if self._T is None:
+            j = np.arange(self.block)
+            lag = j[:, None] - j[None, :]
+            C2 = self.C2[:, None, None]
+            self._T = np.where(lag >= 0, C2 ** np.maximum(lag, 0), 0.0)
+            self._P = self.C2[:, None] ** (j + 1)
+        return self._T, self._P
+
+    def route(self, inflow, out=None):
+        """
+        Route satu chunk inflow (n_reach, ..., n_t)
+
+        out : array tujuan opsional dengan shape sama dengan inflow
+
+        Output:
+        outflow dengan shape yang sama
+        """
+        inflow = np.asarray(inflow, dtype=self.dtype)
+        if inflow.shape[0] != self.n_reach:
+            raise ValueError("Sumbu pertama inflow harus = jumlah ruas")
+
+        if out is None:
+            out = np.empty_like(inflow)
+        elif out.shape != inflow.shape:
+            raise ValueError("Shape out harus sama dengan inflow")
+
+        n_t = inflow.shape[-1]
+        if n_t == 0:
+            return out
+
+        batch = inflow.ndim - 1
+        C0 = self._coef(self.C0, batch)
+        C1 = self._coef(self.C1, batch)
+        C2 = self._coef(self.C2, batch)
+
+        shape = inflow.shape[:-1]
+        if self._I_prev is None:
+            # langkah pertama record: O[0] = O_awal (default I[0])
+            if self._O_prev is None:
+                out[..., 0] = inflow[..., 0]
+            else:
+                out[..., 0] = self._state(self._O_prev, shape)
+            I_prev = inflow[..., 0]
+            O_prev = out[..., 0]
+            start = 1
+        else:
+            I_prev = self._state(self._I_prev, shape)
+            O_prev = (
+                I_prev if self._O_prev is None
+                else self._state(self._O_prev, shape)
+            )
+            start = 0
+
+        lanes = inflow.size // n_t
+        if self.block > 1 and lanes <= self.BLOCK_MAX_LANES:
+            self._route_blocks(inflow, out, start, I_prev, O_prev, C0, C1)
+        else:
+            for t in range(start, n_t):
+                out[..., t] = (
+                    C0 * inflow[..., t] + C1 * I_prev + C2 * O_prev
+                )
+                I_prev = inflow[..., t]
+                O_prev = out[..., t]
+
+        self._I_prev = inflow[..., -1].copy()
+        self._O_prev = out[..., -1].copy()
+        return out
+
+    def _route_blocks(self, inflow, out, start, I_prev, O_prev, C0, C1):
+        T_all, P_all = self._toeplitz()
+        batch = inflow.ndim - 1
+        n_t = inflow.shape[-1]
+
+        for s in range(start, n_t, self.block):
+            e = min(s + self.block, n_t)
+            L = e - s
+            seg = out[..., s:e]
+
+            # suku gaya b[t] = C0 I[t] + C1 I[t-1], langsung di buffer out
+            np.multiply(C0[..., None], inflow[..., s:e], out=seg)
+            seg[..., 0] += C1 * I_prev
+            seg[..., 1:] += C1[..., None] * inflow[..., s:e - 1]
+
+            P = P_all[:, :L].reshape(
+                (self.n_reach,) + (1,) * (batch - 1) + (L,)
+            )
+            seg[...] = (
+                np.einsum("rji,r...i->r...j", T_all[:, :L, :L], seg)
+                + P * O_prev[..., None]
+            )
+            I_prev = inflow[..., e - 1]
+            O_prev = seg[..., -1]
+
+
+# --------------------------------------------------
+# 4. Fungsi utama
+# --------------------------------------------------
+@instrument
+def route_reaches(
+    inflow,
+    C0,
+    C1,
+    C2,
+    initial_outflow=None,
+    block: int = 64,
+    dtype=None
+):
+    """
+    Routing Muskingum untuk banyak ruas (dan banyak kejadian) sekaligus
+
+    inflow : array (n_reach, n_t) atau (n_reach, n_storm, n_t)
+    C0, C1, C2 : koefisien per ruas (muskingum_coefficients)
+
+    Output:
+    outflow, array dengan shape sama dengan inflow
+    """
+    router = MuskingumRouter(C0, C1, C2, block, dtype)
+    router.reset(initial_outflow=initial_outflow)
+    return router.route(inflow)
+
+
+def route_reaches_stream(
+    chunks,
+    C0,
+    C1,
+    C2,
+    block: int = 64,
+    dtype=None
+):
+    """
+    Mode streaming untuk record panjang: chunks adalah iterable array
+    (n_reach, ..., n_chunk); menghasilkan outflow per chunk
+    """
+    router = MuskingumRouter(C0, C1, C2, block, dtype)
+    for chunk in chunks:
+        yield router.route(chunk)
+
+
+@instrument
+def route_network(
+    lateral_inflow,
+    downstream,
+    C0,
+    C1,
+    C2,
+    block: int = 64,
+    dtype=None
+):
+    """
+    Routing jaringan saluran (pohon) ruas demi tingkat.
+
+    lateral_inflow : array (n_reach, ..., n_t), inflow lokal tiap ruas
+    downstream     : array (n_reach,), index ruas hilir (-1 = outlet)
+
+    Ruas pada tingkat yang sama (jumlah ruas hulu terpanjang sama)
+    di-route sebagai satu batch; outflow dijumlahkan ke inflow ruas hilir.
+
+    Output:
+    outflow tiap ruas, shape sama dengan lateral_inflow
+    """
+    lateral_inflow = np.asarray(lateral_inflow, dtype=get_dtype(dtype))
+    downstream = np.asarray(downstream, dtype=int)
+    C0, C1, C2 = (np.atleast_1d(np.asarray(c, dtype=float))
+                  for c in (C0, C1, C2))
+    n_reach = len(downstream)
+
+    # tingkat ruas = panjang lintasan hulu terpanjang
+    level = np.zeros(n_reach, dtype=int)
+    for _ in range(n_reach):
+        has_down = downstream >= 0
+        new_level = level.copy()
+        np.maximum.at(
+            new_level, downstream[has_down], level[has_down] + 1
+        )
+        if np.array_equal(new_level, level):
+            break
+        level = new_level
+    else:
+        raise ValueError("Jaringan saluran mengandung siklus")
+
+    inflow = lateral_inflow.copy()
+    outflow = np.empty_like(inflow)
+
+    for lv in range(level.max() + 1):
+        idx = np.where(level == lv)[0]
+        out = route_reaches(inflow[idx], C0[idx], C1[idx], C2[idx],
+                            block=block, dtype=dtype)
+        outflow[idx] = out
+
+        has_down = downstream[idx] >= 0
+        np.add.at(inflow, downstream[idx][has_down], out[has_down])
+
+    return outflow
+
+
+@instrument
+def muskingum_routing(
+    inflow_df: pd.DataFrame,
+    K_hr: float,
+    X: float
+):
+    """
+    Routing Muskingum satu ruas (antarmuka DataFrame)
+
+    inflow_df:
+        time_min, inflow_cms
+
+    Output:
+    DataFrame time_min, inflow_cms, outflow_cms
+    """
+    dt_min = inflow_df["time_min"].diff().mean()
+    C0, C1, C2 = muskingum_coefficients(K_hr, X, dt_min)
+
+    Qin = inflow_df["inflow_cms"].values
+    Qout = route_reaches(Qin[None, :], C0, C1, C2)[0]
+
+    df = pd.DataFrame({
+        "time_min": inflow_df["time_min"].values,
+        "inflow_cms": Qin,
+        "outflow_cms": Qout
+    })
+
+    return df
@@ -0,0 +1,162 @@
+# modules/composite_cn.py
+import numpy as np
+import pandas as pd
+
+from modules.instrumentation import instrument
+
+
+# --------------------------------------------------
+# Tabel CN standar (TR-55, kondisi AMC II)
+# --------------------------------------------------
+DEFAULT_CN_TABLE = pd.DataFrame(
+    [
+        # land_use, impervious_percent, A, B, C, D
+        ("open_space", 0, 39, 61, 74, 80),
+        ("impervious", 100, 98, 98, 98, 98),
+        ("residential_high", 65, 77, 85, 90, 92),
+        ("residential_medium", 38, 61, 75, 83, 87),
+        ("residential_low", 20, 51, 68, 79, 84),
+        ("commercial", 85, 89, 92, 94, 95),
+        ("industrial", 72, 81, 88, 91, 93),
+        ("row_crops", 0, 67, 78, 85, 89),
+        ("paddy", 0, 70, 79, 84, 88),
+        ("pasture", 0, 39, 61, 74, 80),
+        ("meadow", 0, 30, 58, 71, 78),
+        ("woods", 0, 30, 55, 70, 77),
+        ("water", 100, 98, 98, 98, 98),
+    ],
+    columns=["land_use", "impervious_percent", "A", "B", "C", "D"]
+).melt(
+    id_vars=["land_use", "impervious_percent"],
+    var_name="soil_group",
+    value_name="curve_number"
+)
+
+
+class CurveNumberTable:
+    """
+    Tabel lookup CN (land use × kelompok tanah hidrologi)
+    yang disimpan sebagai array 2D.
+
+    table_df:
+        land_use, soil_group, curve_number, [impervious_percent]
+    """
+
+    def __init__(self, table_df: pd.DataFrame = None):
+        if table_df is None:
+            table_df = DEFAULT_CN_TABLE
+
+        self.land_uses = pd.Index(pd.unique(table_df["land_use"]))
+        self.soil_groups = pd.Index(pd.unique(table_df["soil_group"]))
+
+        i = self.land_uses.get_indexer(table_df["land_use"])
+        j = self.soil_groups.get_indexer(table_df["soil_group"])
+
+        shape = (len(self.land_uses), len(self.soil_groups))
+        self.cn = np.full(shape, np.nan)
+        self.cn[i, j] = table_df["curve_number"].values
+
+        self.impervious = np.zeros(shape)
+        if "impervious_percent" in table_df:
+            self.impervious[i, j] = table_df["impervious_percent"].values
+
+    # --------------------------------------------------
+    def _indexer(self, land_use, soil_group):
+        i = self.land_uses.get_indexer(np.asarray(land_use))
+        j = self.soil_groups.get_indexer(np.asarray(soil_group))
+
+        bad = (i < 0) | (j < 0)
+        ok = ~bad
+        bad[ok] = np.isnan(self.cn[i[ok], j[ok]])
+
+        if bad.any():
+            pairs = pd.unique(pd.Series([
+                f"{lu}/{sg}"
+                for lu, sg in zip(
+                    np.asarray(land_use)[bad][:10],
+                    np.asarray(soil_group)[bad][:10]
+                )
+            ]))
+            raise ValueError(
+                "Kombinasi land use / tanah tidak ada di tabel CN: "
+                + ", ".join(pairs)
+            )
+        return i, j
+
+    def lookup(self, land_use, soil_group):
+        """
+        CN & % impervious untuk array land use / soil group
+
+        Output:
+        curve_number, impervious_percent (array)
+        """
+        i, j = self._indexer(land_use, soil_group)
+        return self.cn[i, j], self.impervious[i, j]
+
+
+# --------------------------------------------------
+# CN komposit per DAS
+# --------------------------------------------------
+@instrument
+def composite_cn(
+    parcels_df: pd.DataFrame,
+    cn_table: CurveNumberTable = None,
+    watershed_col: str = "watershed",
+    area_col: str = "area_ha",
+    land_use_col: str = "land_use",
+    soil_col: str = "soil_group"
+):
+    """
+    CN komposit & % impervious berbobot luas untuk setiap DAS
+
+    parcels_df:
+        watershed, area_ha, land_use, soil_group
+
+    CN = Σ(A_i · CN_i) / Σ A_i
+
+    Output:
+    DataFrame (index watershed) area_ha, curve_number, impervious_percent
+    """
+    if cn_table is None:
+        cn_table = CurveNumberTable()
+
+    cn, imp = cn_table.lookup(
+        parcels_df[land_use_col].values,
+        parcels_df[soil_col].values
+    )
+    area = parcels_df[area_col].values.astype(float)
+
+    # group-by DAS dengan bincount (tanpa loop per parsel / per DAS)
+    codes, ws_ids = pd.factorize(parcels_df[watershed_col], sort=True)
+    n_ws = len(ws_ids)
+
+    area_sum = np.bincount(codes, weights=area, minlength=n_ws)
+    cn_sum = np.bincount(codes, weights=area * cn, minlength=n_ws)
+    imp_sum = np.bincount(codes, weights=area * imp, minlength=n_ws)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        df = pd.DataFrame({
+            "area_ha": area_sum,
+            "curve_number": cn_sum / area_sum,
+            "impervious_percent": imp_sum / area_sum
+        }, index=pd.Index(ws_ids, name=watershed_col))
+
+    return df
+
+
+def apply_composite_cn(
+    watersheds: dict,
+    composite_df: pd.DataFrame
+):
+    """
+    Set CN & % impervious komposit ke objek Watershed
+
+    watersheds : dict id → Watershed (id sesuai index composite_df)
+    """
+    for ws_id, row in composite_df.iterrows():
+        if ws_id in watersheds:
+            watersheds[ws_id].set_land_cover(
+                row["impervious_percent"],
+                row["curve_number"]
+            )
+    return watersheds
@@ -0,0 +1,310 @@
+# modules/events.py
+"""
+Pemisahan kejadian hujan untuk simulasi record panjang.
+
+Record hujan kontinu sebagian besar bernilai nol. Record dipecah menjadi
+kejadian (event) berdasarkan waktu kering antar-kejadian; hanya jendela
+basah + ekor UH / resesi kolam yang dihitung, lalu hasilnya disusun
+kembali ke output sepanjang record (nol di luar jendela).
+"""
+import numpy as np
+import pandas as pd
+
+from modules.instrumentation import instrument
+from modules.pond_routing import interp, modified_puls_step, level_pool_routing_array
+from modules.precision import ACCUMULATOR, TimeAxis, get_dtype
+from modules.scs_cn import runoff_hyetograph_array
+
+
+# --------------------------------------------------
+# 1. Deteksi kejadian
+# --------------------------------------------------
+@instrument
+def detect_events(
+    rainfall_mm,
+    dt_min: float,
+    min_dry_min: float = 360,
+    wet_threshold_mm: float = 0.0
+):
+    """
+    Pisahkan record menjadi kejadian hujan
+
+    min_dry_min      : waktu kering minimum antar-kejadian (menit)
+    wet_threshold_mm : step dianggap basah bila hujan > nilai ini
+
+    Output:
+    array (n_event, 2) index [awal, akhir) tiap kejadian
+    """
+    rainfall_mm = np.asarray(rainfall_mm)
+    wet = np.flatnonzero(rainfall_mm > wet_threshold_mm)
+    if len(wet) == 0:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    # jarak antar step basah > waktu kering → kejadian baru
+    min_gap = max(1, int(np.ceil(min_dry_min / dt_min)))
+    split = np.flatnonzero(np.diff(wet) > min_gap)
+
+    starts = np.concatenate([[wet[0]], wet[split + 1]])
+    ends = np.concatenate([wet[split], [wet[-1]]]) + 1
+
+    return np.stack([starts, ends], axis=1).astype(np.int64)
+
+
+def event_table(
+    rainfall_mm,
+    events,
+    dt_min: float,
+    t0_min: float = 0.0
+):
+    """
+    Ringkasan kejadian
+
+    Output:
+    DataFrame start_min, end_min, duration_min, depth_mm, peak_mm
+    """
+    rainfall_mm = np.asarray(rainfall_mm, dtype=float)
+    starts, ends = events[:, 0], events[:, 1]
+
+    c = np.concatenate([[0.0], np.cumsum(rainfall_mm, dtype=ACCUMULATOR)])
+    depth = c[ends] - c[starts]
+    peak = (
+        np.maximum.reduceat(rainfall_mm, starts) if len(events)
+        else np.zeros(0)
+    )
+
+    return pd.DataFrame({
+        "start_min": t0_min + starts * dt_min,
+        "end_min": t0_min + ends * dt_min,
+        "duration_min": (ends - starts) * dt_min,
+        "depth_mm": depth,
+        "peak_mm": peak
+    })
+
+
+def merge_windows(windows, n: int):
+    """
+    Gabungkan jendela [awal, akhir) yang saling tumpang-tindih,
+    dipotong ke panjang n
+    """
+    if len(windows) == 0:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    w = np.asarray(windows, dtype=np.int64)
+    w = w[np.argsort(w[:, 0])]
+    w[:, 1] = np.minimum(w[:, 1], n)
+
+    # jendela baru dimulai bila awalnya melewati akhir terjauh sebelumnya
+    reach = np.maximum.accumulate(w[:, 1])
+    new = np.concatenate([[True], w[1:, 0] > reach[:-1]])
+    group = np.cumsum(new) - 1
+
+    starts = w[new, 0]
+    ends = np.zeros(len(starts), dtype=np.int64)
+    np.maximum.at(ends, group, w[:, 1])
+    return np.stack([starts, ends], axis=1)
+
+
+# --------------------------------------------------
+# 2. Limpasan & hidrograf per kejadian
+# --------------------------------------------------
+@instrument
+def event_runoff(
+    rainfall_mm,
+    events,
+    curve_number: float,
+    ia_factor: float = 0.2,
+    dtype=None
+):
+    """
+    Limpasan SCS-CN dihitung per kejadian (bukan per seluruh record)
+
+    Output:
+    runoff_mm sepanjang record (nol di luar kejadian)
+    """
+    rainfall_mm = np.asarray(rainfall_mm, dtype=get_dtype(dtype))
+    runoff = np.zeros_like(rainfall_mm)
+
+    for s, e in events:
+        runoff_hyetograph_array(
+            rainfall_mm[s:e], curve_number, ia_factor, out=runoff[s:e]
+        )
+    return runoff
+
+
+@instrument
+def event_hydrograph(
+    runoff_mm,
+    uh_cms_per_mm,
+    events,
+    dtype=None
+):
+    """
+    Konvolusi UH hanya pada jendela kejadian.
+
+    Konvolusi linear, sehingga hasil identik dengan konvolusi seluruh
+    record selama limpasan di luar kejadian bernilai nol.
+
+    Output:
+    debit_cms, panjang len(runoff) + len(uh) - 1
+    """
+    dtype = get_dtype(dtype)
+    runoff_mm = np.asarray(runoff_mm, dtype=dtype)
+    uh = np.asarray(uh_cms_per_mm, dtype=dtype)
+    m = len(uh)
+
+    q = np.zeros(len(runoff_mm) + m - 1, dtype=dtype)
+    for s, e in events:
+        q[s:e + m - 1] += np.convolve(runoff_mm[s:e], uh)
+    return q
+
+
+# --------------------------------------------------
+# 3. Routing kolam dengan lompatan periode kering
+# --------------------------------------------------
+def _drawdown(
+    storage, stage, Qout, i0, i1,
+    dt_sec, stage_table, storage_table, discharge_table, tol_cms
+):
+    """
+    Resesi kolam dengan inflow nol dari step i0 sampai i1 (inklusif).
+    Begitu outflow < tol_cms, state dianggap tetap (fast-forward).
+    """
+    i = i0
+    while i < i1 and Qout[i] > tol_cms:
+        storage[i + 1], stage[i + 1], Qout[i + 1] = modified_puls_step(
+            storage[i], 0.0, 0.0, Qout[i], dt_sec,
+            stage_table, storage_table, discharge_table
+        )
+        i += 1
+
+    storage[i + 1:i1 + 1] = storage[i]
+    stage[i + 1:i1 + 1] = stage[i]
+    Qout[i + 1:i1 + 1] = Qout[i]
+
+
+@instrument
+def event_pond_routing(
+    inflow_cms,
+    windows,
+    stage_table,
+    storage_table,
+    discharge_table,
+    dt_min: float,
+    tol_cms: float = 1e-6,
+    dtype=None
+):
+    """
+    Level pool routing yang hanya melangkah di jendela inflow
+    (plus resesi kolam sampai outflow < tol_cms); di periode kering
+    sisanya state kolam disalin tanpa iterasi.
+
+    windows : array (n, 2) jendela [awal, akhir) dengan inflow > 0
+
+    Output:
+    outflow_cms, stage_m, storage_m3 (sepanjang inflow)
+    """
+    dtype = get_dtype(dtype)
+    Qin = np.asarray(inflow_cms, dtype=dtype)
+    n = len(Qin)
+    dt_sec = dt_min * 60
+
+    storage = np.empty(n, dtype=ACCUMULATOR)
+    stage = np.empty(n, dtype=dtype)
+    Qout = np.empty(n, dtype=dtype)
+    if n == 0:
+        return Qout, stage, storage
+
+    storage[0] = storage_table[0]
+    stage[0] = stage_table[0]
+    Qout[0] = interp(stage[0], stage_table, discharge_table)
+
+    pos = 0      # step terakhir yang state-nya sudah dihitung
+    for s, e in merge_windows(windows, n):
+        start = max(s - 1, 0)
+        if start > pos:
+            _drawdown(
+                storage, stage, Qout, pos, start, dt_sec,
+                stage_table, storage_table, discharge_table, tol_cms
+            )
+
+        level_pool_routing_array(
+            Qin[start:e],
+            stage_table,
+            storage_table,
+            discharge_table,
+            dt_min,
+            out=(Qout[start:e], stage[start:e], storage[start:e]),
+            initial=(storage[start], stage[start], Qout[start])
+        )
+        pos = e - 1
+
+    if pos < n - 1:
+        _drawdown(
+            storage, stage, Qout, pos, n - 1, dt_sec,
+            stage_table, storage_table, discharge_table, tol_cms
+        )
+
+    return Qout, stage, storage
+
+
+# --------------------------------------------------
+# 4. Simulasi lengkap berbasis kejadian
+# --------------------------------------------------
+@instrument
+def simulate_events(
+    rainfall_mm,
+    dt_min: float,
+    curve_number: float,
+    uh_cms_per_mm,
+    stage_storage_df: pd.DataFrame = None,
+    stage_discharge_df: pd.DataFrame = None,
+    min_dry_min: float = 360,
+    ia_factor: float = 0.2,
+    t0_min: float = 0.0,
+    dtype=None
+):
+    """
+    Hujan → limpasan (SCS-CN per kejadian) → hidrograf UH
+    → routing kolam (opsional), hanya pada jendela kejadian
+
+    Output:
+    dict:
+        time        : TimeAxis sepanjang hidrograf
+        events      : DataFrame ringkasan kejadian
+        runoff_mm, debit_cms
+        outflow_cms, stage_m, storage_m3 (bila ada kolam)
+    """
+    rainfall_mm = np.asarray(rainfall_mm)
+    uh = np.asarray(uh_cms_per_mm)
+    m = len(uh)
+
+    events = detect_events(rainfall_mm, dt_min, min_dry_min)
+    runoff = event_runoff(rainfall_mm, events, curve_number, ia_factor, dtype)
+    q = event_hydrograph(runoff, uh, events, dtype)
+
+    result = {
+        "time": TimeAxis(len(q), dt_min, t0_min),
+        "events": event_table(rainfall_mm, events, dt_min, t0_min),
+        "runoff_mm": runoff,
+        "debit_cms": q
+    }
+
+    if stage_storage_df is not None:
+        windows = events.copy()
+        windows[:, 1] += m - 1
+        Qout, stage, storage = event_pond_routing(
+            q,
+            windows,
+            stage_storage_df["stage_m"].values,
+            stage_storage_df["storage_m3"].values,
+            stage_discharge_df["outflow_cms"].values,
+            dt_min,
+            dtype=dtype
+        )
+        result.update({
+            "outflow_cms": Qout,
+            "stage_m": stage,
+            "storage_m3": storage
+        })
+
+    return result
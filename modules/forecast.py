@@ -0,0 +1,311 @@
+# modules/forecast.py
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from modules.instrumentation import instrument
+from modules.pond_routing import interp, modified_puls_step
+from modules.scs_cn import scs_parameters
+
+
+class IncrementalForecaster:
+    """
+    Forecast hidrograf real-time yang diperbarui per langkah hujan.
+
+    Menyimpan UH, buffer ekor konvolusi dan state kolam sehingga setiap
+    nilai hujan baru cukup diproses dalam O(len(UH)), tanpa mengulang
+    konvolusi & routing dari awal.
+
+    Parameters
+    ----------
+    uh_df : DataFrame
+        Output scs_unit_hydrograph (uh_cms_per_mm)
+    dt_min : float
+        Interval waktu (menit), harus sama dengan dt UH
+    curve_number : float, optional
+        Bila diisi, input dianggap hujan (mm) dan dikonversi ke limpasan
+        dengan SCS-CN kumulatif. Bila None, input dianggap limpasan
+        efektif (mm).
+    stage_storage_df, stage_discharge_df : DataFrame, optional
+        Tabel kolam; bila diisi, inflow kolam = hidrograf forecast
+    max_rollback : int
+        Jumlah langkah terakhir yang bisa dikoreksi / di-rollback
+    history : int, optional
+        Panjang riwayat per langkah yang disimpan (rainfall, runoff,
+        flow, pond_*); None = simpan semua
+        (memori tumbuh linear untuk feed panjang), 0 = tanpa riwayat.
+    """
+
+    def __init__(
+        self,
+        uh_df: pd.DataFrame,
+        dt_min: float,
+        curve_number: float = None,
+        ia_factor: float = 0.2,
+        stage_storage_df: pd.DataFrame = None,
+        stage_discharge_df: pd.DataFrame = None,
+        t0_min: float = 0.0,
+        max_rollback: int = 288,
+        history: int = 288
+    ):
+        self.uh = np.asarray(uh_df["uh_cms_per_mm"].values, dtype=float)
+        self.dt_min = dt_min
+        self.t0_min = t0_min
+
+        self.curve_number = curve_number
+        if curve_number is not None:
+            self._S, self._Ia = scs_parameters(curve_number, ia_factor)
+
+        self.has_pond = stage_storage_df is not None
+        if self.has_pond:
+            self._stage_table = stage_storage_df["stage_m"].values
+            self._storage_table = stage_storage_df["storage_m3"].values
+            self._discharge_table = stage_discharge_df["outflow_cms"].values
+
+        self.max_rollback = max_rollback
+        self.history = history
+        self.reset()
+
+    # --------------------------------------------------
+    def reset(self):
+        """
+        Kembali ke kondisi awal (tanpa hujan)
+        """
+        self.n_steps = 0
+        # kontribusi konvolusi ke langkah-langkah mendatang
+        self._tail = np.zeros(len(self.uh) - 1)
+        # debit final langkah terakhir & state kolam (storage, stage, Qout)
+        self._q_last = 0.0
+        self._pond = None
+
+        self._cum_P = 0.0
+        self._cum_Q = 0.0
+
+        # riwayat per langkah (terbatas, hanya untuk tampilan)
+        self.rainfall = deque(maxlen=self.history)
+        self.runoff = deque(maxlen=self.history)
+        self.flow = deque(maxlen=self.history)
+        self.pond_outflow = deque(maxlen=self.history)
+        self.pond_stage = deque(maxlen=self.history)
+        self.pond_storage = deque(maxlen=self.history)
+
+        # state sebelum tiap langkah + nilai inputnya (untuk rollback)
+        self._snapshots = deque(maxlen=self.max_rollback)
+
+    # --------------------------------------------------
+    # Limpasan
+    # --------------------------------------------------
+    def _cumulative_runoff(self, P):
+        if P <= self._Ia:
+            return 0.0
+        return (P - self._Ia) ** 2 / (P - self._Ia + self._S)
+
+    def _to_runoff(self, value):
+        if self.curve_number is None:
+            return value
+
+        cum_P = self._cum_P + value
+        cum_Q = self._cumulative_runoff(cum_P)
+        runoff = cum_Q - self._cum_Q
+
+        self._cum_P = cum_P
+        self._cum_Q = cum_Q
+        return runoff
+
+    # --------------------------------------------------
+    # Update
+    # --------------------------------------------------
+    def push(self, value: float):
+        """
+        Tambah satu langkah hujan (atau limpasan) baru
+
+        Output:
+        debit final (m3/s) pada langkah tersebut
+        """
+        value = float(value)
+        self._snapshots.append((
+            value,
+            self._tail.copy(),
+            self._cum_P,
+            self._cum_Q,
+            self._q_last,
+            self._pond
+        ))
+
+        runoff = self._to_runoff(value)
+
+        # konvolusi inkremental: O(len(UH))
+        contrib = runoff * self.uh
+        contrib[:-1] += self._tail
+        q = contrib[0]
+        self._tail = contrib[1:]
+
+        if self.has_pond:
+            self._route_pond_step(q)
+
+        self._q_last = q
+        self.n_steps += 1
+
+        self.rainfall.append(value)
+        self.runoff.append(runoff)
+        self.flow.append(q)
+        if self.has_pond:
+            storage, stage, Qout = self._pond
+            self.pond_storage.append(storage)
+            self.pond_stage.append(stage)
+            self.pond_outflow.append(Qout)
+
+        return q
+
+    @instrument
+    def extend(self, values):
+        """
+        Tambah beberapa langkah sekaligus
+        """
+        return np.array([self.push(v) for v in values])
+
+    def _route_pond_step(self, q):
+        if self._pond is None:
+            stage = self._stage_table[0]
+            self._pond = (
+                self._storage_table[0],
+                stage,
+                interp(stage, self._stage_table, self._discharge_table)
+            )
+            return
+
+        storage, _, Qout = self._pond
+        self._pond = modified_puls_step(
+            storage,
+            self._q_last,
+            q,
+            Qout,
+            self.dt_min * 60,
+            self._stage_table,
+            self._storage_table,
+            self._discharge_table
+        )
+
+    # --------------------------------------------------
+    # Koreksi data
+    # --------------------------------------------------
+    def rollback(self, n: int = 1):
+        """
+        Batalkan n langkah terakhir
+
+        Output:
+        list nilai input yang dibatalkan (urut waktu)
+        """
+        if n <= 0:
+            return []
+        if n > len(self._snapshots):
+            raise ValueError(
+                f"Rollback maksimum {len(self._snapshots)} langkah"
+            )
+
+        removed = [self._snapshots.pop() for _ in range(n)][::-1]
+        (
+            _, self._tail, self._cum_P, self._cum_Q,
+            self._q_last, self._pond
+        ) = removed[0]
+        self.n_steps -= n
+
+        for series in (
+            self.rainfall, self.runoff, self.flow,
+            self.pond_outflow, self.pond_stage, self.pond_storage
+        ):
+            for _ in range(min(n, len(series))):
+                series.pop()
+
+        return [snap[0] for snap in removed]
+
+    @instrument
+    def correct(self, index: int, value: float):
+        """
+        Koreksi nilai input pada langkah index (mis. koreksi gauge),
+        lalu hitung ulang langkah-langkah sesudahnya.
+        Hanya untuk max_rollback langkah terakhir.
+        """
+        if index < 0:
+            index += self.n_steps
+        if not 0 <= index < self.n_steps:
+            raise IndexError("Index langkah di luar rentang")
+
+        replay = self.rollback(self.n_steps - index)
+        replay[0] = value
+        self.extend(replay)
+
+    # --------------------------------------------------
+    # Output
+    # --------------------------------------------------
+    def history_frame(self):
+        """
+        Riwayat langkah yang masih tersimpan (lihat parameter history)
+
+        Output:
+        DataFrame time_min, rainfall_mm, runoff_mm, debit_cms
+        (+ outflow_cms, stage_m, storage_m3 bila ada kolam)
+        """
+        n = len(self.flow)
+        df = pd.DataFrame({
+            "time_min": self.t0_min
+            + np.arange(self.n_steps - n, self.n_steps) * self.dt_min,
+            "rainfall_mm": np.fromiter(self.rainfall, float, n),
+            "runoff_mm": np.fromiter(self.runoff, float, n),
+            "debit_cms": np.fromiter(self.flow, float, n)
+        })
+        if self.has_pond:
+            df["outflow_cms"] = np.fromiter(self.pond_outflow, float, n)
+            df["stage_m"] = np.fromiter(self.pond_stage, float, n)
+            df["storage_m3"] = np.fromiter(self.pond_storage, float, n)
+        return df
+
+    @instrument
+    def forecast(self):
+        """
+        Horizon forecast dari state saat ini: ekor konvolusi (dengan
+        asumsi tidak ada hujan lagi) mulai langkah berikutnya, termasuk
+        routing kolam atas ekor tersebut. Biaya O(len(UH)), tidak
+        bergantung pada panjang record.
+
+        Output:
+        DataFrame time_min, debit_cms
+        (+ outflow_cms, stage_m, storage_m3 bila ada kolam)
+        """
+        q = self._tail
+        n = len(q)
+
+        df = pd.DataFrame({
+            "time_min": self.t0_min
+            + np.arange(self.n_steps, self.n_steps + n) * self.dt_min,
+            "debit_cms": q.copy()
+        })
+
+        if not self.has_pond or self._pond is None:
+            return df
+
+        storage = np.empty(n)
+        stage = np.empty(n)
+        Qout = np.empty(n)
+
+        dt_sec = self.dt_min * 60
+        prev_storage, _, prev_Q = self._pond
+        prev_q = self._q_last
+        for i in range(n):
+            storage[i], stage[i], Qout[i] = modified_puls_step(
+                prev_storage,
+                prev_q,
+                q[i],
+                prev_Q,
+                dt_sec,
+                self._stage_table,
+                self._storage_table,
+                self._discharge_table
+            )
+            prev_storage, prev_q, prev_Q = storage[i], q[i], Qout[i]
+
+        df["outflow_cms"] = Qout
+        df["stage_m"] = stage
+        df["storage_m3"] = storage
+        return df
@@ -0,0 +1,385 @@
+# modules/gauge_ingest.py
+import csv
+import glob
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from modules.instrumentation import instrument
+from modules.precision import TimeAxis, get_dtype
+
+GAUGE_EXTENSIONS = (".csv", ".txt", ".xlsx", ".xls")
+
+# kata kunci nama kolom (huruf kecil)
+TIME_KEYWORDS = ("time", "waktu", "date", "tanggal", "jam", "timestamp")
+# kolom waktu numerik dalam jam (selain itu dianggap menit)
+HOUR_KEYWORDS = ("jam", "hour")
+RAIN_KEYWORDS = ("rain", "hujan", "precip", "curah")
+# dipakai hanya bila tidak ada kolom yang cocok dengan RAIN_KEYWORDS
+RAIN_FALLBACK_KEYWORDS = ("mm",)
+# kolom kumulatif bukan hujan per step
+CUMULATIVE_KEYWORDS = ("cumul", "kumulatif", "akumulasi")
+
+
+# --------------------------------------------------
+# 1. Baca satu file (format sniffing)
+# --------------------------------------------------
+def _sniff_csv(path):
+    """
+    Deteksi delimiter, desimal & header dari potongan awal file
+    """
+    with open(path, newline="", errors="replace") as f:
+        sample = f.read(8192)
+
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t| ")
+        sep = dialect.delimiter
+    except csv.Error:
+        sep = ","
+
+    # "12,5" dengan delimiter ";" → desimal koma (format Excel Indonesia)
+    decimal = "," if sep != "," and re.search(r"\d,\d", sample) else "."
+
+    # baris pertama seluruhnya angka → tanpa header (Sniffer gagal
+    # menebak delimiter pada file satu kolom)
+    if _is_numeric_row(sample, sep, decimal):
+        header = None
+    else:
+        try:
+            header = 0 if csv.Sniffer().has_header(sample) else None
+        except csv.Error:
+            header = 0
+
+    return sep, decimal, header
+
+
+def _is_numeric_row(sample, sep, decimal):
+    lines = sample.splitlines()
+    if not lines:
+        return False
+
+    cells = [c.strip() for c in lines[0].split(sep) if c.strip()]
+    try:
+        for c in cells:
+            float(c.replace(decimal, "."))
+    except ValueError:
+        return False
+    return bool(cells)
+
+
+def read_gauge_file(path: str):
+    """
+    Baca file gauge (CSV / TXT / Excel) apa adanya
+
+    Output:
+    DataFrame mentah
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".xlsx", ".xls"):
+        return pd.read_excel(path)
+
+    sep, decimal, header = _sniff_csv(path)
+    df = pd.read_csv(
+        path,
+        sep=sep,
+        decimal=decimal,
+        header=header,
+        skipinitialspace=True
+    )
+    if header is None:
+        df.columns = [f"col_{i}" for i in range(df.shape[1])]
+    return df
+
+
+# --------------------------------------------------
+# 2. Deteksi kolom waktu & hujan
+# --------------------------------------------------
+def _is_datetime_column(series):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return True
+    if not (series.dtype == object or pd.api.types.is_string_dtype(series)):
+        return False
+    parsed = pd.to_datetime(series.head(20), errors="coerce", format="mixed")
+    return parsed.notna().mean() > 0.8
+
+
+def detect_columns(df: pd.DataFrame):
+    """
+    Tentukan kolom waktu (boleh None) & kolom hujan
+
+    Output:
+    time_col, rain_col
+    """
+    names = {c: str(c).strip().lower() for c in df.columns}
+
+    time_col = next(
+        (c for c, n in names.items() if any(k in n for k in TIME_KEYWORDS)),
+        None
+    )
+    if time_col is None:
+        time_col = next(
+            (c for c in df.columns if _is_datetime_column(df[c])),
+            None
+        )
+
+    candidates = [
+        c for c in df.columns
+        if c != time_col
+        and not any(k in names[c] for k in CUMULATIVE_KEYWORDS)
+    ]
+    rain_col = None
+    for keywords in (RAIN_KEYWORDS, RAIN_FALLBACK_KEYWORDS):
+        rain_col = next(
+            (c for c in candidates if any(k in names[c] for k in keywords)),
+            None
+        )
+        if rain_col is not None:
+            break
+
+    if rain_col is None:
+        numeric = [
+            c for c in candidates
+            if pd.to_numeric(df[c], errors="coerce").notna().mean() > 0.8
+        ]
+        if not numeric:
+            raise ValueError("Kolom hujan tidak ditemukan")
+        rain_col = numeric[0]
+
+    return time_col, rain_col
+
+
+def parse_gauge(df: pd.DataFrame):
+    """
+    Ambil seri waktu & hujan dari DataFrame mentah
+
+    Kolom waktu numerik dibaca sebagai menit, kecuali namanya memuat
+    "jam" / "hour" (dikonversi dari jam ke menit).
+
+    Output:
+    time (datetime64 / menit float / None), rainfall_mm (array)
+    """
+    time_col, rain_col = detect_columns(df)
+    rain = pd.to_numeric(df[rain_col], errors="coerce").values
+
+    if time_col is None:
+        return None, rain
+
+    t = df[time_col]
+    if _is_datetime_column(t):
+        time = pd.to_datetime(t, errors="coerce", format="mixed").values
+    else:
+        time = pd.to_numeric(t, errors="coerce").values.astype(float)
+        if any(k in str(time_col).strip().lower() for k in HOUR_KEYWORDS):
+            time = time * 60
+
+    valid = ~pd.isna(time)
+    return time[valid], rain[valid]
+
+
+def _load_one(path):
+    time, rain = parse_gauge(read_gauge_file(path))
+    name = os.path.splitext(os.path.basename(path))[0]
+    return name, time, rain
+
+
+# --------------------------------------------------
+# 3. Penyimpanan 2D (waktu × gauge)
+# --------------------------------------------------
+class GaugeStore:
+    """
+    Data hujan seluruh gauge pada sumbu waktu bersama
+
+    values  : array (n_time, n_gauge), NaN = data tidak ada
+    time    : TimeAxis (menit sejak start)
+    start   : Timestamp awal (None bila waktu relatif menit)
+    gauges  : list nama gauge
+    errors  : dict nama file → pesan error (file yang dilewati)
+    """
+
+    def __init__(self, values, time, gauges, start=None, errors=None):
+        self.values = values
+        self.time = time
+        self.gauges = list(gauges)
+        self.start = start
+        self.errors = errors or {}
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def index_of(self, gauge: str):
+        return self.gauges.index(gauge)
+
+    def gauge(self, name: str):
+        """
+        Satu gauge sebagai DataFrame rainfall (time_min, rainfall_mm,
+        cumulative_mm), data kosong diisi 0
+        """
+        rain = np.nan_to_num(self.values[:, self.index_of(name)])
+        return pd.DataFrame({
+            "time_min": self.time.values(),
+            "rainfall_mm": rain,
+            "cumulative_mm": np.cumsum(rain)
+        })
+
+    def to_dataframe(self):
+        index = self.time.values()
+        if self.start is not None:
+            index = self.start + pd.to_timedelta(index, unit="min")
+        return pd.DataFrame(self.values, index=index, columns=self.gauges)
+
+    def save(self, path: str):
+        np.savez_compressed(
+            path,
+            values=self.values,
+            gauges=np.array(self.gauges),
+            time=np.array([self.time.n, self.time.dt_min, self.time.t0_min]),
+            start=np.array(
+                "" if self.start is None else self.start.isoformat()
+            )
+        )
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as z:
+            n, dt, t0 = z["time"]
+            start = str(z["start"])
+            return cls(
+                z["values"],
+                TimeAxis(int(n), dt, t0),
+                z["gauges"].tolist(),
+                pd.Timestamp(start) if start else None
+            )
+
+
+# --------------------------------------------------
+# 4. Penyelarasan ke sumbu waktu bersama
+# --------------------------------------------------
+def align_series(series: list, dt_min: float = None, dtype=None):
+    """
+    Selaraskan list (nama, waktu, hujan) ke satu array 2D.
+
+    Hujan yang jatuh dalam step [t, t + dt) yang sama dijumlahkan
+    (resampling depth), step tanpa data = NaN.
+
+    Output:
+    GaugeStore
+    """
+    dtype = get_dtype(dtype)
+    kinds = {
+        "none" if t is None
+        else "datetime" if np.issubdtype(t.dtype, np.datetime64)
+        else "minutes"
+        for _, t, _ in series
+    }
+    if len(kinds) > 1:
+        raise ValueError(
+            "Format waktu antar gauge berbeda: " + ", ".join(sorted(kinds))
+        )
+    kind = kinds.pop() if kinds else "none"
+
+    start = None
+    if kind == "none":
+        if dt_min is None:
+            raise ValueError("File tanpa kolom waktu membutuhkan dt_min")
+        times = [np.arange(len(r)) * dt_min for _, _, r in series]
+    elif kind == "datetime":
+        start = pd.Timestamp(min(t.min() for _, t, _ in series))
+        times = [
+            (t - start.to_datetime64()) / np.timedelta64(1, "m")
+            for _, t, _ in series
+        ]
+    else:
+        times = [t for _, t, _ in series]
+
+    if dt_min is None:
+        # step terkecil antar gauge
+        steps = [np.diff(np.unique(t)) for t in times if len(t) > 1]
+        dt_min = float(min(np.median(s) for s in steps)) if steps else 1.0
+
+    t0 = min(t.min() for t in times if len(t))
+    t1 = max(t.max() for t in times if len(t))
+    n = int(np.floor((t1 - t0) / dt_min + 1e-9)) + 1
+
+    values = np.zeros((n, len(series)), dtype=dtype)
+    counts = np.zeros((n, len(series)), dtype=np.int32)
+
+    for j, ((_, _, rain), t) in enumerate(zip(series, times)):
+        # step [t, t + dt); toleransi kecil untuk pembulatan float
+        idx = np.floor((t - t0) / dt_min + 1e-9).astype(np.int64)
+        ok = ~np.isnan(rain)
+        np.add.at(values[:, j], idx[ok], rain[ok])
+        np.add.at(counts[:, j], idx[ok], 1)
+
+    values[counts == 0] = np.nan
+
+    if start is not None:
+        start = start + pd.Timedelta(minutes=t0)
+        t0 = 0.0
+
+    return GaugeStore(
+        values,
+        TimeAxis(n, dt_min, t0),
+        [name for name, _, _ in series],
+        start
+    )
+
+
+# --------------------------------------------------
+# 5. Ingest satu direktori secara paralel
+# --------------------------------------------------
+@instrument
+def load_gauge_directory(
+    directory: str,
+    dt_min: float = None,
+    pattern: str = "*",
+    max_workers: int = 8,
+    errors: str = "raise",
+    dtype=None
+):
+    """
+    Baca seluruh file gauge dalam direktori di thread pool,
+    lalu selaraskan ke satu array 2D (waktu × gauge).
+
+    dt_min : time step sumbu bersama (default: step terkecil data);
+             wajib bila file tidak punya kolom waktu
+    errors : "raise" atau "skip" (file gagal dicatat di store.errors)
+
+    Output:
+    GaugeStore
+    """
+    paths = sorted(
+        p for p in glob.glob(os.path.join(directory, pattern))
+        if p.lower().endswith(GAUGE_EXTENSIONS)
+    )
+    if not paths:
+        raise ValueError(f"Tidak ada file gauge di {directory}")
+
+    def task(path):
+        try:
+            return _load_one(path), None
+        except Exception as exc:
+            if errors == "raise":
+                raise
+            return None, f"{type(exc).__name__}: {exc}"
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(task, paths))
+
+    series = []
+    failed = {}
+    for path, (item, err) in zip(paths, results):
+        if err is None:
+            series.append(item)
+        else:
+            failed[os.path.basename(path)] = err
+
+    if not series:
+        raise ValueError("Tidak ada file gauge yang bisa dibaca")
+
+    store = align_series(series, dt_min, dtype)
+    store.errors = failed
+    return store
@@ -2,7 +2,89 @@
 import numpy as np
 import pandas as pd
 
+from modules.instrumentation import instrument
+from modules.channel_routing import MuskingumRouter
+from modules.precision import get_dtype
 
+
+def _uh_time(tc_min, dt_min):
+    # Parameter standar SCS
+    tp = 0.6 * tc_min        # time to peak (menit)
+    tb = 2.67 * tp           # base time (menit)
+
+    time = np.arange(0, tb + dt_min, dt_min)
+    return time, tp, tb
+
+
+@instrument
+def scs_unit_hydrograph_array(
+    tc_min: float,
+    dt_min: float,
+    area_ha: float,
+    dtype=None
+):
+    """
+    Ordinat SCS Unit Hydrograph (array, m3/s per mm hujan)
+    pada t = 0, dt, 2dt, ...
+
+    Dihitung dalam float64 (normalisasi), lalu dikonversi ke dtype.
+    """
+    time, tp, tb = _uh_time(tc_min, dt_min)
+
+    # segitiga: naik sampai tp, turun sampai tb, 0 sesudahnya
+    uh = np.where(time <= tp, time / tp, (tb - time) / (tb - tp))
+    np.maximum(uh, 0.0, out=uh)
+
+    uh /= uh.sum()           # normalisasi unit depth
+
+    # Konversi ke debit (m3/s per mm hujan)
+    area_m2 = area_ha * 10_000
+    uh *= area_m2
+    uh /= 1000
+    uh /= dt_min * 60
+
+    return uh.astype(get_dtype(dtype), copy=False)
+
+
+@instrument
+def scs_unit_hydrograph_batch(
+    tc_min,
+    dt_min: float,
+    area_ha: float,
+    dtype=None
+):
+    """
+    SCS Unit Hydrograph untuk banyak nilai Tc sekaligus
+
+    tc_min : array (n,)
+
+    Output:
+    array (n, n_max) ordinat UH (m3/s per mm), baris diisi nol
+    setelah base time masing-masing
+    """
+    tc_min = np.atleast_1d(np.asarray(tc_min, dtype=float))
+    tp = 0.6 * tc_min[:, None]
+    tb = 2.67 * tp
+
+    # panjang tiap UH sama dengan np.arange(0, tb + dt, dt)
+    lengths = np.ceil((tb[:, 0] + dt_min) / dt_min).astype(np.int64)
+    time = np.arange(lengths.max()) * dt_min
+
+    uh = np.where(time <= tp, time / tp, (tb - time) / (tb - tp))
+    np.maximum(uh, 0.0, out=uh)
+    uh[np.arange(lengths.max()) >= lengths[:, None]] = 0.0
+
+    uh /= uh.sum(axis=1, keepdims=True)
+
+    area_m2 = area_ha * 10_000
+    uh *= area_m2
+    uh /= 1000
+    uh /= dt_min * 60
+
+    return uh.astype(get_dtype(dtype), copy=False)
+
+
+@instrument
 def scs_unit_hydrograph(
     tc_min: float,
     dt_min: float,
@@ -19,37 +101,36 @@ def scs_unit_hydrograph(
     Output:
     DataFrame time_min, uh_cms_per_mm
     """
-
-    # Parameter standar SCS
-    tp = 0.6 * tc_min        # time to peak (menit)
-    tb = 2.67 * tp           # base time (menit)
-
-    time = np.arange(0, tb + dt_min, dt_min)
-
-    uh = np.zeros_like(time, dtype=float)
-
-    for i, t in enumerate(time):
-        if t <= tp:
-            uh[i] = t / tp
-        elif tp < t <= tb:
-            uh[i] = (tb - t) / (tb - tp)
-        else:
-            uh[i] = 0
-
-    uh = uh / uh.sum()       # normalisasi unit depth
-
-    # Konversi ke debit (m3/s per mm hujan)
-    area_m2 = area_ha * 10_000
-    uh_cms = uh * area_m2 / 1000 / (dt_min * 60)
+    time, _, _ = _uh_time(tc_min, dt_min)
 
     df = pd.DataFrame({
         "time_min": time,
-        "uh_cms_per_mm": uh_cms
+        "uh_cms_per_mm": scs_unit_hydrograph_array(tc_min, dt_min, area_ha)
     })
 
     return df
 
 
+@instrument
+def runoff_hydrograph_array(
+    runoff_mm,
+    uh_cms_per_mm,
+    dtype=None
+):
+    """
+    Konvolusi limpasan efektif dengan UH (array)
+
+    Output:
+    debit_cms (array), panjang len(runoff) + len(uh) - 1
+    """
+    dtype = get_dtype(dtype)
+    return np.convolve(
+        np.asarray(runoff_mm, dtype=dtype),
+        np.asarray(uh_cms_per_mm, dtype=dtype)
+    )
+
+
+@instrument
 def runoff_hydrograph(
     runoff_df: pd.DataFrame,
     uh_df: pd.DataFrame
@@ -58,10 +139,10 @@ def runoff_hydrograph(
     Konvolusi limpasan efektif dengan Unit Hydrograph
     """
 
-    runoff = runoff_df["runoff_mm"].values
-    uh = uh_df["uh_cms_per_mm"].values
-
-    q = np.convolve(runoff, uh)
+    q = runoff_hydrograph_array(
+        runoff_df["runoff_mm"].values,
+        uh_df["uh_cms_per_mm"].values
+    )
 
     dt_min = runoff_df["time_min"].diff().mean()
     time = np.arange(0, len(q) * dt_min, dt_min)
@@ -74,6 +155,38 @@ def runoff_hydrograph(
     return df
 
 
+@instrument
+def santa_barbara_routing_array(
+    runoff_mm,
+    dt_min: float,
+    tc_min: float,
+    out=None,
+    dtype=None
+):
+    """
+    Santa Barbara Urban Hydrograph Method (array)
+
+    Q[i] = Q[i-1] + K * (R[i-1] + R[i] - 2 Q[i-1]),  Q[0] = 0
+    K = dt / (2 tc + dt)
+
+    Rekursi ini berbentuk Muskingum (C0 = C1 = K, C2 = 1 - 2K),
+    sehingga dievaluasi dengan MuskingumRouter.
+
+    out : array tujuan opsional, panjang sama dengan runoff
+
+    Output:
+    debit_relative (array)
+    """
+    K = dt_min / (2 * tc_min + dt_min)
+
+    router = MuskingumRouter([K], [K], [1 - 2 * K], dtype=dtype)
+    router.reset(initial_outflow=np.zeros(1, dtype=router.dtype))
+    if out is not None:
+        out = out[None, :]
+    return router.route(np.asarray(runoff_mm)[None, :], out=out)[0]
+
+
+@instrument
 def santa_barbara_routing(
     runoff_df: pd.DataFrame,
     tc_min: float
@@ -83,18 +196,8 @@ def santa_barbara_routing(
     """
 
     dt_min = runoff_df["time_min"].diff().mean()
-    dt_hr = dt_min / 60
-
-    K = dt_min / (2 * tc_min + dt_min)
-
-    Q = np.zeros(len(runoff_df))
-
-    for i in range(1, len(runoff_df)):
-        R1 = runoff_df.loc[i - 1, "runoff_mm"]
-        R2 = runoff_df.loc[i, "runoff_mm"]
-        Q1 = Q[i - 1]
-
-        Q[i] = Q1 + K * (R1 + R2 - 2 * Q1)
 
-    runoff_df["debit_relative"] = Q
+    runoff_df["debit_relative"] = santa_barbara_routing_array(
+        runoff_df["runoff_mm"].values, dt_min, tc_min
+    )
     return runoff_df
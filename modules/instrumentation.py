@@ -0,0 +1,363 @@
+# modules/instrumentation.py
+"""
+Instrumentasi ringan untuk hot-path engine & I/O.
+
+Pemakaian:
+
+    from modules.instrumentation import instrument, timed, enable
+
+    @instrument
+    def runoff_hydrograph(...):
+        ...
+
+    with timed("app.plot_hydrograph"):
+        ...
+
+Saklar & statistik disimpan per Profile. Profile aktif dipilih per
+thread / konteks (ContextVar) dengan activate(), mis. satu Profile per
+sesi Streamlit; thread lain (job background, sesi lain) memakai
+Profile default proses dan tidak tercampur.
+
+Instrumentasi nonaktif secara default (atau aktifkan Profile default
+dengan env HIDRO_PROFILE=1 / HIDRO_PROFILE=memory). Saat tidak ada
+Profile yang aktif, wrapper hanya melakukan satu pengecekan counter
+sebelum memanggil fungsi asli.
+
+Catatan: tracemalloc bersifat global per proses. Peak memori hanya
+akurat bila tidak ada thread lain yang mengalokasi memori bersamaan
+(mis. job background yang sedang berjalan).
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class Profile:
+    """
+    Saklar & statistik instrumentasi satu pemakai (sesi / thread)
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.lock = threading.Lock()
+        # nama -> statistik agregat
+        self.registry = {}
+        # tuple stack nama -> waktu sendiri (detik), untuk profil flame-graph
+        self.stacks = {}
+
+
+class _State:
+    # jumlah Profile yang aktif (jalur cepat saat semuanya nonaktif)
+    n_enabled = 0
+    # Profile yang mencatat memori
+    memory_users = weakref.WeakSet()
+    # tracemalloc dinyalakan oleh modul ini (bukan oleh pemanggil lain)
+    owns_tracemalloc = False
+
+
+_state = _State()
+_lock = threading.Lock()
+_local = threading.local()
+
+_default = Profile()
+_current = ContextVar("hidro_profile", default=None)
+
+
+def _profile():
+    profile = _current.get()
+    return _default if profile is None else profile
+
+
+def activate(profile: Profile = None):
+    """
+    Pakai profile untuk thread / konteks saat ini
+    (None = kembali ke Profile default proses)
+    """
+    _current.set(profile)
+    return _profile()
+
+
+# --------------------------------------------------
+# Saklar (Profile aktif)
+# --------------------------------------------------
+def enable(memory: bool = False):
+    """
+    Aktifkan instrumentasi.
+
+    memory=True juga mencatat delta memori (tracemalloc), dengan
+    overhead yang jauh lebih besar.
+    """
+    profile = _profile()
+    with _lock:
+        if not profile.enabled:
+            profile.enabled = True
+            _state.n_enabled += 1
+    _set_memory(profile, memory)
+
+
+def disable():
+    profile = _profile()
+    with _lock:
+        if profile.enabled:
+            profile.enabled = False
+            _state.n_enabled -= 1
+    _set_memory(profile, False)
+
+
+def _set_memory(profile, memory):
+    with _lock:
+        profile.memory = memory
+        if memory:
+            _state.memory_users.add(profile)
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _state.owns_tracemalloc = True
+            return
+
+        _state.memory_users.discard(profile)
+        if _state.memory_users:
+            return
+        if _state.owns_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        _state.owns_tracemalloc = False
+
+
+def is_enabled():
+    return _profile().enabled
+
+
+def reset():
+    profile = _profile()
+    with profile.lock:
+        profile.registry.clear()
+        profile.stacks.clear()
+
+
+# --------------------------------------------------
+# Ukuran array argumen / hasil
+# --------------------------------------------------
+def _n_elements(obj):
+    """
+    Jumlah elemen untuk ndarray / DataFrame / Series / list,
+    0 untuk skalar & objek lain
+    """
+    size = getattr(obj, "size", None)
+    if isinstance(size, int):
+        return size
+    if isinstance(obj, (list, tuple)):
+        return sum(_n_elements(x) for x in obj) or len(obj)
+    return 0
+
+
+def _record(profile, name, stack, elapsed, child_time, n_in, n_out, mem):
+    with profile.lock:
+        s = profile.registry.get(name)
+        if s is None:
+            s = profile.registry[name] = {
+                "name": name,
+                "calls": 0,
+                "total_time_s": 0.0,
+                "self_time_s": 0.0,
+                "max_time_s": 0.0,
+                "elements_in": 0,
+                "elements_out": 0,
+                "max_elements_in": 0,
+                "memory_delta_bytes": 0,
+                "peak_memory_bytes": 0
+            }
+
+        s["calls"] += 1
+        s["total_time_s"] += elapsed
+        s["self_time_s"] += elapsed - child_time
+        s["max_time_s"] = max(s["max_time_s"], elapsed)
+        s["elements_in"] += n_in
+        s["elements_out"] += n_out
+        s["max_elements_in"] = max(s["max_elements_in"], n_in)
+        if mem is not None:
+            s["memory_delta_bytes"] += mem[0]
+            s["peak_memory_bytes"] = max(s["peak_memory_bytes"], mem[1])
+
+        profile.stacks[stack] = (
+            profile.stacks.get(stack, 0.0) + elapsed - child_time
+        )
+
+
+# --------------------------------------------------
+# Context manager & decorator
+# --------------------------------------------------
+class _Frame:
+    def __init__(self, name):
+        self.name = name
+        self.child_time = 0.0
+        # peak tracemalloc absolut selama frame terbuka
+        self.peak = 0
+
+
+def _frames():
+    frames = getattr(_local, "frames", None)
+    if frames is None:
+        frames = _local.frames = []
+    return frames
+
+
+class _Timer:
+    """
+    Pengukur satu panggilan (dipakai bersama oleh timed & instrument)
+    """
+
+    def __init__(self, profile, name, n_in=0):
+        self.profile = profile
+        self.name = name
+        self.n_in = n_in
+        self.n_out = 0
+
+    def __enter__(self):
+        frames = _frames()
+        parent = frames[-1] if frames else None
+        self.frame = _Frame(self.name)
+        frames.append(self.frame)
+        self.stack = tuple(f.name for f in frames)
+
+        self.mem0 = None
+        if self.profile.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            # simpan peak frame induk sebelum direset untuk frame ini
+            if parent is not None:
+                parent.peak = max(parent.peak, peak)
+            self.mem0 = current
+            tracemalloc.reset_peak()
+
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.t0
+
+        mem = None
+        if self.mem0 is not None and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            self.frame.peak = max(self.frame.peak, peak)
+            mem = (current - self.mem0, self.frame.peak - self.mem0)
+
+        frames = _frames()
+        frames.pop()
+        if frames:
+            frames[-1].child_time += elapsed
+            frames[-1].peak = max(frames[-1].peak, self.frame.peak)
+
+        _record(
+            self.profile,
+            self.name, self.stack, elapsed, self.frame.child_time,
+            self.n_in, self.n_out, mem
+        )
+        return False
+
+
+@contextmanager
+def timed(name: str):
+    """
+    Ukur blok kode bebas (mis. plotting di app)
+    """
+    profile = _profile()
+    if not profile.enabled:
+        yield None
+        return
+
+    with _Timer(profile, name) as timer:
+        yield timer
+
+
+def instrument(func=None, *, name: str = None):
+    """
+    Decorator: catat jumlah panggilan, waktu, ukuran array & memori.
+
+    Nama default: "<modul>.<fungsi>", mis. "hydrograph.runoff_hydrograph"
+    """
+    if func is None:
+        return lambda f: instrument(f, name=name)
+
+    label = name or (
+        f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+    )
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _state.n_enabled:
+            return func(*args, **kwargs)
+        profile = _profile()
+        if not profile.enabled:
+            return func(*args, **kwargs)
+
+        n_in = sum(_n_elements(a) for a in args)
+        n_in += sum(_n_elements(v) for v in kwargs.values())
+
+        with _Timer(profile, label, n_in) as timer:
+            result = func(*args, **kwargs)
+            timer.n_out = _n_elements(result)
+        return result
+
+    wrapper.__wrapped__ = func
+    return wrapper
+
+
+# --------------------------------------------------
+# Laporan & ekspor
+# --------------------------------------------------
+def stats():
+    """
+    Statistik per fungsi, diurutkan berdasarkan total waktu
+
+    Output:
+    list of dict
+    """
+    profile = _profile()
+    with profile.lock:
+        rows = [dict(s) for s in profile.registry.values()]
+
+    for r in rows:
+        r["mean_time_s"] = r["total_time_s"] / r["calls"]
+    return sorted(rows, key=lambda r: r["total_time_s"], reverse=True)
+
+
+def export_json(path: str = None):
+    """
+    Ekspor statistik sebagai JSON (string; ditulis ke file bila path diisi)
+    """
+    text = json.dumps({"stats": stats()}, indent=4)
+    if path:
+        with open(path, "w") as f:
+            f.write(text)
+    return text
+
+
+def export_collapsed(path: str = None):
+    """
+    Ekspor profil dalam format "collapsed stack" (mikrodetik waktu
+    sendiri per stack), kompatibel dengan flamegraph.pl & speedscope
+    """
+    profile = _profile()
+    with profile.lock:
+        items = sorted(profile.stacks.items())
+
+    lines = [
+        f"{';'.join(stack)} {max(int(round(t * 1e6)), 1)}"
+        for stack, t in items
+    ]
+    text = "\n".join(lines) + ("\n" if lines else "")
+    if path:
+        with open(path, "w") as f:
+            f.write(text)
+    return text
+
+
+# aktivasi via environment
+_env = os.environ.get("HIDRO_PROFILE", "").lower()
+if _env in ("1", "true", "yes", "memory"):
+    enable(memory=_env == "memory")
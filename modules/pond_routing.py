@@ -2,6 +2,9 @@
 import numpy as np
 import pandas as pd
 
+from modules.instrumentation import instrument
+from modules.precision import ACCUMULATOR, get_dtype
+
 
 # --------------------------------------------------
 # Helper: interpolasi stage-storage-discharge
@@ -10,9 +13,111 @@ def interp(x, x_table, y_table):
     return np.interp(x, x_table, y_table)
 
 
+# --------------------------------------------------
+# Helper: satu langkah Modified Puls
+# --------------------------------------------------
+def modified_puls_step(
+    S1: float,
+    Qin1: float,
+    Qin2: float,
+    Qout1: float,
+    dt_sec: float,
+    stage_table,
+    storage_table,
+    discharge_table
+):
+    """
+    Satu langkah routing kolam
+
+    Output:
+    storage (m3), stage (m), outflow (m3/s) di akhir langkah
+    """
+    # Modified Puls
+    RHS = (
+        S1
+        + 0.5 * dt_sec * (Qin1 + Qin2)
+        - 0.5 * dt_sec * Qout1
+    )
+
+    # cari storage baru (iterasi sederhana via interpolasi)
+    storage = RHS
+    stage = interp(storage, storage_table, stage_table)
+    Qout = interp(stage, stage_table, discharge_table)
+
+    return storage, stage, Qout
+
+
+# --------------------------------------------------
+# Routing kolam (Level Pool) – array
+# --------------------------------------------------
+@instrument
+def level_pool_routing_array(
+    inflow_cms,
+    stage_table,
+    storage_table,
+    discharge_table,
+    dt_min: float,
+    out=None,
+    dtype=None,
+    initial=None
+):
+    """
+    Level Pool Routing (Modified Puls Method) pada array
+
+    inflow_cms : array inflow per step (m3/s)
+    *_table    : array tabel stage-storage-discharge
+    out        : tuple opsional (outflow, stage, storage) sebagai tujuan
+    initial    : tuple opsional (storage, stage, outflow) pada step 0;
+                 default kolam kosong (baris pertama tabel)
+    dtype      : presisi outflow & stage; storage (neraca volume)
+                 selalu float64
+
+    Output:
+    outflow_cms, stage_m, storage_m3 (array)
+    """
+    dtype = get_dtype(dtype)
+    Qin = np.asarray(inflow_cms, dtype=dtype)
+    n = len(Qin)
+
+    if out is None:
+        Qout = np.zeros(n, dtype=dtype)
+        stage = np.zeros(n, dtype=dtype)
+        storage = np.zeros(n, dtype=ACCUMULATOR)
+    else:
+        Qout, stage, storage = out
+
+    if n == 0:
+        return Qout, stage, storage
+
+    # kondisi awal
+    if initial is None:
+        stage[0] = stage_table[0]
+        storage[0] = storage_table[0]
+        Qout[0] = interp(stage[0], stage_table, discharge_table)
+    else:
+        storage[0], stage[0], Qout[0] = initial
+
+    dt_sec = dt_min * 60
+
+    for i in range(1, n):
+        storage[i], stage[i], Qout[i] = modified_puls_step(
+            storage[i - 1],
+            Qin[i - 1],
+            Qin[i],
+            Qout[i - 1],
+            dt_sec,
+            stage_table,
+            storage_table,
+            discharge_table
+        )
+
+    return Qout, stage, storage
+
+
 # --------------------------------------------------
 # Routing kolam (Level Pool)
 # --------------------------------------------------
+@instrument
 def level_pool_routing(
     inflow_df: pd.DataFrame,
     stage_storage_df: pd.DataFrame,
@@ -35,38 +140,13 @@ def level_pool_routing(
     time = inflow_df["time_min"].values
     Qin = inflow_df["inflow_cms"].values
 
-    stage_table = stage_storage_df["stage_m"].values
-    storage_table = stage_storage_df["storage_m3"].values
-    discharge_table = stage_discharge_df["outflow_cms"].values
-
-    n = len(Qin)
-
-    stage = np.zeros(n)
-    storage = np.zeros(n)
-    Qout = np.zeros(n)
-
-    # kondisi awal
-    stage[0] = stage_table[0]
-    storage[0] = storage_table[0]
-    Qout[0] = interp(stage[0], stage_table, discharge_table)
-
-    dt_sec = dt_min * 60
-
-    for i in range(1, n):
-        S1 = storage[i - 1]
-        Qout1 = Qout[i - 1]
-
-        # Modified Puls
-        RHS = (
-            S1
-            + 0.5 * dt_sec * (Qin[i - 1] + Qin[i])
-            - 0.5 * dt_sec * Qout1
-        )
-
-        # cari storage baru (iterasi sederhana via interpolasi)
-        storage[i] = RHS
-        stage[i] = interp(storage[i], storage_table, stage_table)
-        Qout[i] = interp(stage[i], stage_table, discharge_table)
+    Qout, stage, storage = level_pool_routing_array(
+        Qin,
+        stage_storage_df["stage_m"].values,
+        stage_storage_df["storage_m3"].values,
+        stage_discharge_df["outflow_cms"].values,
+        dt_min
+    )
 
     df = pd.DataFrame({
         "time_min": time,
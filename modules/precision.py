@@ -0,0 +1,151 @@
+# modules/precision.py
+"""
+Pengaturan presisi numerik engine.
+
+Default float64. Mode float32 menghemat separuh memori untuk simulasi
+panjang / banyak DAS; akumulator volume (jumlah hujan, storage kolam)
+tetap float64.
+
+    from modules.precision import set_precision, precision
+
+    set_precision("float32")          # thread / konteks saat ini
+
+    with precision("float32"):        # sementara
+        ...
+
+    runoff_hyetograph_array(P, 75, dtype="float32")   # per panggilan
+
+Pengaturan disimpan di ContextVar, sehingga tiap thread (sesi app,
+worker job) punya presisi sendiri. Default proses diatur dengan
+set_default_precision atau env HIDRO_PRECISION=float32.
+"""
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import numpy as np
+
+# tipe akumulator (jumlah volume / storage) selalu float64
+ACCUMULATOR = np.float64
+
+_ALLOWED = (np.dtype(np.float32), np.dtype(np.float64))
+
+
+class _State:
+    # default proses, dipakai bila konteks belum mengatur presisi
+    dtype = np.dtype(np.float64)
+
+
+_state = _State()
+_context = ContextVar("hidro_precision", default=None)
+
+
+# --------------------------------------------------
+# Saklar
+# --------------------------------------------------
+def _check(dtype):
+    dtype = np.dtype(dtype)
+    if dtype not in _ALLOWED:
+        raise ValueError("Presisi harus float32 atau float64")
+    return dtype
+
+
+def set_default_precision(dtype):
+    """
+    Atur presisi default seluruh proses ("float32" / "float64")
+    """
+    _state.dtype = _check(dtype)
+
+
+def set_precision(dtype):
+    """
+    Atur presisi untuk thread / konteks saat ini saja
+    """
+    _context.set(_check(dtype))
+
+
+def get_precision():
+    dtype = _context.get()
+    return _state.dtype if dtype is None else dtype
+
+
+@contextmanager
+def precision(dtype):
+    """
+    Presisi sementara di dalam blok with (hanya konteks saat ini)
+    """
+    token = _context.set(_check(dtype))
+    try:
+        yield _context.get()
+    finally:
+        _context.reset(token)
+
+
+def get_dtype(dtype=None):
+    """
+    dtype per panggilan bila diisi, selain itu presisi konteks saat ini
+    """
+    if dtype is None:
+        return get_precision()
+    return _check(dtype)
+
+
+# --------------------------------------------------
+# Sumbu waktu lazy
+# --------------------------------------------------
+class TimeAxis:
+    """
+    Sumbu waktu seragam t = t0 + i * dt yang tidak disimpan sebagai
+    array; nilai dibuat saat dibutuhkan (np.asarray, indexing, slicing).
+    """
+
+    def __init__(self, n: int, dt_min: float, t0_min: float = 0.0):
+        self.n = int(n)
+        self.dt_min = dt_min
+        self.t0_min = t0_min
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.n)
+            return self.t0_min + np.arange(start, stop, step) * self.dt_min
+
+        if key < 0:
+            key += self.n
+        if not 0 <= key < self.n:
+            raise IndexError("Index waktu di luar rentang")
+        return self.t0_min + key * self.dt_min
+
+    def __array__(self, dtype=None, copy=None):
+        return self.values(dtype)
+
+    def values(self, dtype=None):
+        """
+        Materialisasi sebagai array (default float64 agar waktu
+        record panjang tetap presisi)
+        """
+        time = self.t0_min + np.arange(self.n) * self.dt_min
+        return time if dtype is None else time.astype(dtype)
+
+    def index_of(self, time_min: float):
+        """
+        Index step terdekat untuk waktu tertentu
+        """
+        return int(round((time_min - self.t0_min) / self.dt_min))
+
+    @property
+    def end_min(self):
+        return self.t0_min + (self.n - 1) * self.dt_min
+
+    def __repr__(self):
+        return (
+            f"TimeAxis(n={self.n}, dt_min={self.dt_min}, "
+            f"t0_min={self.t0_min})"
+        )
+
+
+_env = os.environ.get("HIDRO_PRECISION")
+if _env:
+    set_default_precision(_env)
@@ -2,7 +2,10 @@
 import pandas as pd
 import numpy as np
 
+from modules.instrumentation import instrument
 
+
+@instrument
 def rainfall_manual(
     rainfall_mm: list,
     dt_min: float
@@ -33,6 +36,7 @@ def rainfall_manual(
     return df
 
 
+@instrument
 def scs_dimensionless_curve(
     total_rainfall_mm: float,
     duration_hr: float,
@@ -75,6 +79,7 @@ def scs_dimensionless_curve(
     return df
 
 
+@instrument
 def import_rainfall_csv(
     filepath: str,
     dt_min: float
@@ -95,6 +100,7 @@ def import_rainfall_csv(
     return df
 
 
+@instrument
 def rainfall_summary(df):
     """
     Ringkasan hujan
@@ -104,3 +110,217 @@ def rainfall_summary(df):
         "max_intensity_mm_hr": df["rainfall_mm"].max() * 60 / (df["time_min"].diff().mean()),
         "duration_min": df["time_min"].max()
     }
+
+
+# --------------------------------------------------
+# Statistik hujan streaming (record panjang / live feed)
+# --------------------------------------------------
+class RainfallStatsAccumulator:
+    """
+    Statistik hujan online, diperbarui per blok data.
+
+    Memori tetap terhadap panjang record:
+    - hujan maksimum per durasi: ring buffer (w - 1) nilai terakhir
+    - periode basah / kering: panjang run yang sedang berjalan
+    - kuantil: histogram log dengan bin tetap (galat relatif ~ 2%)
+
+    Parameters
+    ----------
+    dt_min : float
+        Interval waktu data (menit)
+    durations_min : list
+        Durasi hujan maksimum yang dicari (menit, kelipatan dt)
+    wet_threshold_mm : float
+        Batas step basah (mm)
+    quantiles : list
+        Kuantil hujan step basah yang dilaporkan
+    """
+
+    def __init__(
+        self,
+        dt_min: float,
+        durations_min=(60, 180, 360, 1440),
+        wet_threshold_mm: float = 0.1,
+        quantiles=(0.5, 0.9, 0.95, 0.99),
+        n_bins: int = 400,
+        max_mm: float = 1000.0
+    ):
+        self.dt_min = dt_min
+        self.wet_threshold_mm = wet_threshold_mm
+        self.quantiles = tuple(quantiles)
+
+        # durasi → jumlah step (minimal 1 step)
+        self.durations = {
+            d: max(1, int(round(d / dt_min)))
+            for d in sorted(set((dt_min,) + tuple(durations_min)))
+        }
+        self._tails = {d: np.zeros(0) for d in self.durations}
+        self.max_depth = {d: 0.0 for d in self.durations}
+
+        self.n_steps = 0
+        self.n_missing = 0
+        self.n_wet = 0
+        self.total_mm = 0.0
+
+        # periode basah / kering
+        self._run_wet = None
+        self._run_len = 0
+        self.wet_spells = 0
+        self.dry_spells = 0
+        self.max_wet_spell = 0
+        self.max_dry_spell = 0
+
+        # histogram log untuk kuantil step basah
+        lo = max(wet_threshold_mm, 1e-3)
+        self._edges = np.geomspace(lo, max_mm, n_bins + 1)
+        self._counts = np.zeros(n_bins + 2, dtype=np.int64)
+
+    # --------------------------------------------------
+    def update(self, block):
+        """
+        Tambah satu blok hujan (array atau DataFrame rainfall_mm).
+        NaN dianggap data hilang: dihitung sebagai step kering
+        untuk periode basah/kering dan 0 untuk akumulasi durasi.
+        """
+        if isinstance(block, pd.DataFrame):
+            block = block["rainfall_mm"].values
+        x = np.asarray(block, dtype=float).ravel()
+        if len(x) == 0:
+            return self
+
+        missing = np.isnan(x)
+        self.n_missing += int(missing.sum())
+        x = np.where(missing, 0.0, x)
+
+        self.n_steps += len(x)
+        self.total_mm += float(x.sum())
+
+        self._update_windows(x)
+
+        wet = x >= self.wet_threshold_mm
+        self.n_wet += int(wet.sum())
+        self._update_spells(wet)
+
+        bins = np.searchsorted(self._edges, x[wet], side="right")
+        self._counts += np.bincount(bins, minlength=len(self._counts))
+
+        return self
+
+    def _update_windows(self, x):
+        for d, w in self.durations.items():
+            buf = np.concatenate([self._tails[d], x])
+            if len(buf) >= w:
+                c = np.concatenate([[0.0], np.cumsum(buf)])
+                best = float((c[w:] - c[:-w]).max())
+                self.max_depth[d] = max(self.max_depth[d], best)
+            elif len(buf):
+                # record masih lebih pendek dari durasi
+                self.max_depth[d] = max(self.max_depth[d], float(buf.sum()))
+            self._tails[d] = buf[len(buf) - (w - 1):] if w > 1 else buf[:0]
+
+    def _update_spells(self, wet):
+        # batas run di dalam blok
+        change = np.flatnonzero(wet[1:] != wet[:-1]) + 1
+        starts = np.concatenate([[0], change])
+        lengths = np.diff(np.concatenate([starts, [len(wet)]]))
+        states = wet[starts]
+
+        # run pertama menyambung run dari blok sebelumnya
+        if self._run_wet is not None and states[0] == self._run_wet:
+            lengths[0] += self._run_len
+        elif self._run_wet is not None:
+            self._close_run(self._run_wet, self._run_len)
+
+        for state, length in zip(states[:-1], lengths[:-1]):
+            self._close_run(state, length)
+
+        self._run_wet = bool(states[-1])
+        self._run_len = int(lengths[-1])
+
+    def _close_run(self, is_wet, length):
+        if is_wet:
+            self.wet_spells += 1
+            self.max_wet_spell = max(self.max_wet_spell, int(length))
+        else:
+            self.dry_spells += 1
+            self.max_dry_spell = max(self.max_dry_spell, int(length))
+
+    # --------------------------------------------------
+    def quantile(self, q: float):
+        """
+        Perkiraan kuantil hujan per step basah (mm)
+        """
+        total = self._counts.sum()
+        if total == 0:
+            return 0.0
+
+        cum = np.cumsum(self._counts)
+        k = int(np.searchsorted(cum, q * total))
+        if k == 0:
+            return float(self._edges[0])
+        if k > len(self._edges) - 1:
+            return float(self.max_depth[self.dt_min])
+
+        # interpolasi geometrik di dalam bin
+        lo, hi = self._edges[k - 1], self._edges[k]
+        before = cum[k - 1]
+        frac = (q * total - before) / max(self._counts[k], 1)
+        return float(lo * (hi / lo) ** min(max(frac, 0.0), 1.0))
+
+    def summary(self):
+        """
+        Ringkasan hujan (bisa dipanggil kapan saja selama streaming)
+        """
+        wet_spells = self.wet_spells
+        dry_spells = self.dry_spells
+        max_wet = self.max_wet_spell
+        max_dry = self.max_dry_spell
+        if self._run_wet is not None:
+            if self._run_wet:
+                wet_spells += 1
+                max_wet = max(max_wet, self._run_len)
+            else:
+                dry_spells += 1
+                max_dry = max(max_dry, self._run_len)
+
+        return {
+            "total_rainfall_mm": self.total_mm,
+            "max_intensity_mm_hr": self.max_depth[self.dt_min] * 60 / self.dt_min,
+            # sama dengan rainfall_summary: waktu step terakhir (t0 = 0)
+            "duration_min": max(self.n_steps - 1, 0) * self.dt_min,
+            "n_steps": self.n_steps,
+            "n_missing": self.n_missing,
+            "wet_fraction": self.n_wet / self.n_steps if self.n_steps else 0.0,
+            "max_depth_mm": {
+                d: self.max_depth[d] for d in self.durations
+            },
+            "max_intensity_by_duration_mm_hr": {
+                d: self.max_depth[d] * 60 / (w * self.dt_min)
+                for d, w in self.durations.items()
+            },
+            "wet_spells": wet_spells,
+            "dry_spells": dry_spells,
+            "max_wet_spell_min": max_wet * self.dt_min,
+            "max_dry_spell_min": max_dry * self.dt_min,
+            "wet_step_quantiles_mm": {
+                q: self.quantile(q) for q in self.quantiles
+            }
+        }
+
+
+@instrument
+def rainfall_summary_stream(
+    blocks,
+    dt_min: float,
+    **kwargs
+):
+    """
+    Ringkasan hujan dari generator blok (tanpa memuat seluruh record)
+
+    blocks : iterable array / DataFrame rainfall_mm
+    kwargs : diteruskan ke RainfallStatsAccumulator
+    """
+    acc = RainfallStatsAccumulator(dt_min, **kwargs)
+    for block in blocks:
+        acc.update(block)
+    return acc.summary()
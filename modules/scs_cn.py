@@ -2,7 +2,11 @@
 import numpy as np
 import pandas as pd
 
+from modules.instrumentation import instrument
+from modules.precision import ACCUMULATOR, get_dtype
 
+
+@instrument
 def scs_parameters(
     curve_number: float,
     ia_factor: float = 0.2
@@ -22,6 +26,7 @@ def scs_parameters(
     return S, Ia
 
 
+@instrument
 def runoff_total(
     total_rainfall_mm: float,
     curve_number: float,
@@ -41,27 +46,82 @@ def runoff_total(
     return Q
 
 
-def runoff_hyetograph(
-    rainfall_df: pd.DataFrame,
-    curve_number: float,
+@instrument
+def runoff_total_batch(
+    total_rainfall_mm,
+    curve_number,
     ia_factor: float = 0.2
 ):
     """
-    Distribusi limpasan per time step
+    Limpasan total (mm) untuk banyak nilai CN / hujan sekaligus
+    (array, saling broadcast)
+    """
+    P = np.asarray(total_rainfall_mm, dtype=float)
+    CN = np.asarray(curve_number, dtype=float)
+
+    if np.any((CN < 30) | (CN > 98)):
+        raise ValueError("Curve Number harus antara 30 – 98")
+
+    S = (25400 / CN) - 254
+    Ia = ia_factor * S
+
+    excess = np.maximum(P - Ia, 0.0)
+    return excess ** 2 / (excess + S)
+
+
+@instrument
+def runoff_hyetograph_array(
+    rainfall_mm,
+    curve_number: float,
+    ia_factor: float = 0.2,
+    out=None,
+    dtype=None
+):
     """
-    P_total = rainfall_df["rainfall_mm"].sum()
+    Distribusi limpasan per time step (array)
+
+    rainfall_mm : array hujan per step (mm)
+    out         : array tujuan opsional (tanpa alokasi baru)
+    dtype       : float32 / float64 (default: presisi global)
+
+    Output:
+    runoff_mm (array), Q_total (mm)
+    """
+    rainfall_mm = np.asarray(rainfall_mm, dtype=get_dtype(dtype))
+    if out is None:
+        out = np.empty_like(rainfall_mm)
+
+    P_total = float(rainfall_mm.sum(dtype=ACCUMULATOR))
     Q_total = runoff_total(P_total, curve_number, ia_factor)
 
     if Q_total == 0:
-        rainfall_df["runoff_mm"] = 0.0
-        return rainfall_df, 0.0
+        out[:] = 0.0
+        return out, 0.0
 
-    ratio = rainfall_df["rainfall_mm"] / P_total
-    rainfall_df["runoff_mm"] = ratio * Q_total
+    np.divide(rainfall_mm, P_total, out=out)
+    out *= Q_total
+
+    return out, Q_total
+
+
+@instrument
+def runoff_hyetograph(
+    rainfall_df: pd.DataFrame,
+    curve_number: float,
+    ia_factor: float = 0.2
+):
+    """
+    Distribusi limpasan per time step
+    """
+    runoff, Q_total = runoff_hyetograph_array(
+        rainfall_df["rainfall_mm"].values, curve_number, ia_factor
+    )
+    rainfall_df["runoff_mm"] = runoff
 
     return rainfall_df, Q_total
 
 
+@instrument
 def runoff_volume_m3(
     runoff_mm: float,
     area_ha: float
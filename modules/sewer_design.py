@@ -1,10 +1,13 @@
 # modules/sewer_design.py
 import numpy as np
 
+from modules.instrumentation import instrument
+
 
 # --------------------------------------------------
 # 1. Debit rencana – Metode Rasional
 # --------------------------------------------------
+@instrument
 def rational_discharge(
     C: float,
     I_mm_hr: float,
@@ -28,6 +31,7 @@ def rational_discharge(
 # --------------------------------------------------
 # 2. Intensitas hujan – IDF (bentuk umum PU)
 # --------------------------------------------------
+@instrument
 def rainfall_intensity_idf(
     A: float,
     B: float,
@@ -51,6 +55,7 @@ def rainfall_intensity_idf(
 # --------------------------------------------------
 # 3. Kecepatan & debit pipa – Manning
 # --------------------------------------------------
+@instrument
 def manning_pipe_full(
     diameter_m: float,
     slope: float,
@@ -77,6 +82,7 @@ def manning_pipe_full(
 # --------------------------------------------------
 # 4. Cek kapasitas pipa
 # --------------------------------------------------
+@instrument
 def check_pipe_capacity(
     Q_design: float,
     Q_pipe: float
@@ -94,6 +100,7 @@ def check_pipe_capacity(
 # --------------------------------------------------
 # 5. Estimasi diameter pipa minimum
 # --------------------------------------------------
+@instrument
 def estimate_pipe_diameter(
     Q_design: float,
     slope: float,
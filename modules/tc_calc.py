@@ -1,10 +1,13 @@
 # modules/tc_calc.py
 import numpy as np
 
+from modules.instrumentation import instrument
+
 
 # --------------------------------------------------
 # 1. Kirpich (alami / saluran kecil)
 # --------------------------------------------------
+@instrument
 def tc_kirpich(
     L_m: float,
     S: float
@@ -26,6 +29,7 @@ def tc_kirpich(
 # --------------------------------------------------
 # 2. Kerby (aliran lembar / overland flow)
 # --------------------------------------------------
+@instrument
 def tc_kerby(
     L_m: float,
     n: float,
@@ -49,6 +53,7 @@ def tc_kerby(
 # --------------------------------------------------
 # 3. NRCS / TR-55 (sheet + shallow + channel)
 # --------------------------------------------------
+@instrument
 def tc_tr55(
     L_sheet: float,
     n_sheet: float,
@@ -87,6 +92,7 @@ def tc_tr55(
 # --------------------------------------------------
 # 4. FAA Formula (bandara / permukaan keras)
 # --------------------------------------------------
+@instrument
 def tc_faa(
     L_m: float,
     S: float
@@ -108,6 +114,7 @@ def tc_faa(
 # --------------------------------------------------
 # 5. Ringkasan otomatis
 # --------------------------------------------------
+@instrument
 def tc_summary(**kwargs):
     """
     Hitung beberapa metode sekaligus
@@ -1,6 +1,9 @@
 # modules/watershed.py
 import numpy as np
 
+from modules.instrumentation import instrument
+from modules.precision import ACCUMULATOR, get_dtype
+
 
 class Watershed:
     """
@@ -13,15 +16,32 @@ class Watershed:
         impervious_percent: float,
         tc_min: float,
         abstraction_pervious_mm: float = 0.0,
-        abstraction_impervious_mm: float = 0.0
+        abstraction_impervious_mm: float = 0.0,
+        curve_number: float = None
     ):
         self.area_ha = area_ha
-        self.impervious_percent = impervious_percent
         self.tc_min = tc_min
         self.abstraction_pervious_mm = abstraction_pervious_mm
         self.abstraction_impervious_mm = abstraction_impervious_mm
 
         self.area_m2 = area_ha * 10_000
+        self.curve_number = None
+        self.set_land_cover(impervious_percent, curve_number)
+
+    # --------------------------------------------------
+    def set_land_cover(
+        self,
+        impervious_percent: float,
+        curve_number: float = None
+    ):
+        """
+        Perbarui % impervious (dan CN komposit) beserta luasannya.
+        curve_number=None mempertahankan CN yang sudah ada.
+        """
+        self.impervious_percent = impervious_percent
+        if curve_number is not None:
+            self.curve_number = curve_number
+
         self.area_impervious_m2 = self.area_m2 * impervious_percent / 100
         self.area_pervious_m2 = self.area_m2 - self.area_impervious_m2
 
@@ -31,10 +51,60 @@ class Watershed:
             "Luas DAS (ha)": self.area_ha,
             "Luas Impervious (m2)": self.area_impervious_m2,
             "Luas Pervious (m2)": self.area_pervious_m2,
-            "Tc (menit)": self.tc_min
+            "Tc (menit)": self.tc_min,
+            "Curve Number": self.curve_number
         }
 
     # --------------------------------------------------
+    @instrument
+    def horton_infiltration_array(
+        self,
+        f0: float,
+        fc: float,
+        k: float,
+        rainfall_mm,
+        dt_min: float,
+        time_min=None,
+        out=None,
+        dtype=None
+    ):
+        """
+        Horton Infiltration Method (array)
+
+        rainfall_mm : array hujan per step (mm)
+        time_min    : array waktu (menit); default 0, dt, 2dt, ...
+        out         : tuple opsional (infiltration, excess) sebagai tujuan
+        dtype       : float32 / float64 (default: presisi global)
+
+        Output:
+        infiltration_mm, excess_rain_mm (array)
+        """
+        rainfall_mm = np.asarray(rainfall_mm, dtype=get_dtype(dtype))
+        if time_min is None:
+            time_min = np.arange(len(rainfall_mm)) * dt_min
+
+        if out is None:
+            infiltration = np.empty_like(rainfall_mm)
+            excess = np.empty_like(rainfall_mm)
+        else:
+            infiltration, excess = out
+
+        dt_hr = dt_min / 60
+
+        # f(t) * dt, dihitung di tempat
+        np.divide(time_min, 60, out=infiltration)
+        infiltration *= -k
+        np.exp(infiltration, out=infiltration)
+        infiltration *= f0 - fc
+        infiltration += fc
+        infiltration *= dt_hr
+
+        np.subtract(rainfall_mm, infiltration, out=excess)
+        np.maximum(excess, 0, out=excess)
+
+        return infiltration, excess
+
+    @instrument
     def horton_infiltration(
         self,
         f0: float,
@@ -55,31 +125,48 @@ class Watershed:
         rainfall_df : DataFrame dari rainfall.py
         """
 
-        dt_hr = rainfall_df["time_min"].diff().mean() / 60
-        time_hr = rainfall_df["time_min"] / 60
-
-        infiltration_rate = fc + (f0 - fc) * np.exp(-k * time_hr)
-        infiltration = infiltration_rate * dt_hr
+        infiltration, excess = self.horton_infiltration_array(
+            f0,
+            fc,
+            k,
+            rainfall_df["rainfall_mm"].values,
+            rainfall_df["time_min"].diff().mean(),
+            time_min=rainfall_df["time_min"].values
+        )
 
         rainfall_df["infiltration_mm"] = infiltration
-        rainfall_df["excess_rain_mm"] = (
-            rainfall_df["rainfall_mm"] - infiltration
-        ).clip(lower=0)
+        rainfall_df["excess_rain_mm"] = excess
 
         return rainfall_df
 
     # --------------------------------------------------
-    def scs_cn_runoff(
+    @instrument
+    def scs_cn_runoff_array(
         self,
-        rainfall_df,
-        curve_number: float,
-        ia_factor: float = 0.2
+        rainfall_mm,
+        curve_number: float = None,
+        ia_factor: float = 0.2,
+        out=None,
+        dtype=None
     ):
         """
-        SCS Curve Number Method
+        SCS Curve Number Method (array)
+
+        curve_number default: CN DAS (mis. hasil CN komposit)
+
+        Output:
+        runoff_mm per step (array, dibagi rata), Q total (mm)
         """
+        rainfall_mm = np.asarray(rainfall_mm, dtype=get_dtype(dtype))
+        if out is None:
+            out = np.empty_like(rainfall_mm)
+
+        if curve_number is None:
+            curve_number = self.curve_number
+        if curve_number is None:
+            raise ValueError("Curve Number DAS belum ditentukan")
 
-        P = rainfall_df["rainfall_mm"].sum()
+        P = float(rainfall_mm.sum(dtype=ACCUMULATOR))
         S = (25400 / curve_number) - 254
         Ia = ia_factor * S
 
@@ -88,11 +175,30 @@ class Watershed:
         else:
             Q = ((P - Ia) ** 2) / (P - Ia + S)
 
-        rainfall_df["runoff_mm"] = Q / len(rainfall_df)
+        out[:] = Q / len(rainfall_mm)
+
+        return out, Q
+
+    @instrument
+    def scs_cn_runoff(
+        self,
+        rainfall_df,
+        curve_number: float = None,
+        ia_factor: float = 0.2
+    ):
+        """
+        SCS Curve Number Method
+        """
+
+        runoff, Q = self.scs_cn_runoff_array(
+            rainfall_df["rainfall_mm"].values, curve_number, ia_factor
+        )
+        rainfall_df["runoff_mm"] = runoff
 
         return rainfall_df, Q
 
     # --------------------------------------------------
+    @instrument
     def runoff_volume(self, runoff_mm: float):
         """
         Menghitung volume limpasan (m3)